@@ -3,20 +3,25 @@ import io
 import os
 import sys
 import json
+import zipfile
 import streamlit as st
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+
+# orjson is optional; fall back to stdlib json when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-# Project modules
-from src import parser, ats_score, gpt_client
-from src.pdf_exporter import generate_resume_pdf
+# Project modules (parse path). reportlab, the PDF exporters and gpt_client are
+# imported where they are used so the first paint doesn't wait on them.
+from src import parser, ats_score
+from src.extractor import HEADING_LINE_RE
 
 # Layout Engine modules
-from src.layout_engine.template_mapper import map_text_to_template
-from src.layout_engine.fallback_renderer import render_fallback_pdf
+from src.layout_engine.template_mapper import load_template, map_text_to_template
 
 # -----------------------------
 # Environment / API Config
@@ -27,27 +32,90 @@ AZURE_DEPLOYMENT_NAME = os.getenv("AZURE_DEPLOYMENT_NAME")
 PDFSHIFT_API_KEY = os.getenv("PDFSHIFT_API_KEY")
 
 # -----------------------------
-# Utility: Fallback text→PDF
+# Cached template / PDF builders
+# -----------------------------
+# Streamlit reruns the whole script on every widget interaction, so keep the
+# template and the rendered PDFs around instead of rebuilding them each time.
+def _json_dumps(obj) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False)
+
+
+@st.cache_resource
+def _load_template(path: str) -> dict:
+    return load_template(path)
+
+
+@st.cache_data(show_spinner=False)
+def _build_pdf(enhanced_text: str, template_path: str) -> bytes:
+    from src.pdf_exporter import generate_resume_pdf
+    mapped = map_text_to_template(enhanced_text, _load_template(template_path))
+    return generate_resume_pdf(_json_dumps(mapped))
+
+
+@st.cache_data(show_spinner=False)
+def _build_fallback_pdf(enhanced_text: str) -> bytes:
+    from src.layout_engine.fallback_renderer import render_fallback_pdf
+    return render_fallback_pdf(enhanced_text)
+
+
+@st.cache_data(show_spinner=False)
+def _build_text_pdf(enhanced_text: str) -> bytes:
+    from src.pdf_utils import text_to_pdf_bytes
+    return text_to_pdf_bytes(enhanced_text)
+
+
+# -----------------------------
+# Cached ATS scoring
 # -----------------------------
-def text_to_pdf_bytes(text: str) -> bytes:
-    """Convert plain text to simple fallback PDF."""
-    buffer = io.BytesIO()
-    p = canvas.Canvas(buffer, pagesize=letter)
-    p.setFont("Helvetica", 11)
-    width, height = letter
-    y = height - 50
+@st.cache_data(show_spinner=False, max_entries=64)
+def _cached_score(resume_text: str, jd: str):
+    return ats_score.score_resume(resume_text, jd)
 
-    for line in text.splitlines():
-        if y < 60:
-            p.showPage()
-            p.setFont("Helvetica", 11)
-            y = height - 50
-        p.drawString(50, y, line[:110])
-        y -= 15
 
-    p.save()
-    buffer.seek(0)
-    return buffer.read()
+@st.cache_data(show_spinner=False, max_entries=64)
+def _cached_kw(jd: str, top_n: int):
+    return ats_score.extract_job_keywords(jd, top_n=top_n)
+
+# -----------------------------
+# Section-level enhancement
+# -----------------------------
+def enhance_by_section(parsed: dict, job_keywords, stream: bool = False) -> str:
+    """
+    Enhance the sections worth rewriting (batched, then in parallel) and keep the rest verbatim.
+    Falls back to one whole-text call, written to the page token by token when `stream` is set.
+    """
+    from src import gpt_client
+
+    text = parsed.get("text", "")
+    # Slice the original text at its heading lines rather than using parsed["sections"]:
+    # that dict keeps only the last body per heading and holds a whitespace-collapsed copy.
+    matches = list(HEADING_LINE_RE.finditer(text))
+    blocks = []  # (title-cased heading, heading line as written, original body)
+    for i, m in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        blocks.append((m.group(1).strip().title(), m.group(0).strip(), text[m.end():end].strip()))
+    titles = [title for title, _, _ in blocks]
+    # a repeated heading can't be mapped back from a per-heading rewrite; send the whole text
+    if len(blocks) < 2 or len(set(titles)) != len(titles):
+        if not stream:
+            return gpt_client.enhance_resume_text(text, job_keywords)
+        return st.write_stream(gpt_client.enhance_resume_text_stream(text, job_keywords)).strip()
+    # keep the name/contact block above the first heading as-is
+    header = text[:matches[0].start()].strip()
+    # only prose-heavy sections go over the wire; the rest are reassembled verbatim
+    targets = {title: body for title, _, body in blocks if body and gpt_client.needs_rewrite(title, body)}
+    enhanced = {}
+    if targets:
+        try:
+            # one request for all sections; fan out per section if the reply can't be mapped back
+            enhanced = gpt_client.enhance_sections_batch(targets, job_keywords)
+        except ValueError:
+            enhanced = gpt_client.enhance_sections(targets, job_keywords)
+    parts = [header] if header else []
+    parts.extend(f"{line}\n{enhanced.get(title, body)}" for title, line, body in blocks if body)
+    return "\n\n".join(parts)
 
 # -----------------------------
 # Streamlit UI Configuration
@@ -85,7 +153,10 @@ if "parsed" not in st.session_state:
     st.session_state.update({
         "parsed": None,
         "ats": None,
-        "enhanced_text": None
+        "enhanced_text": None,
+        "preview_1200": "",
+        "preview_600": "",
+        "enhanced_preview_600": "",
     })
 
 # -----------------------------
@@ -95,6 +166,10 @@ if uploaded_file and st.button("🔍 Parse Resume"):
     try:
         parsed = parser.parse_and_extract(uploaded_file)
         st.session_state["parsed"] = parsed
+        # slice previews once here instead of on every rerun
+        text = parsed.get("text", "")
+        st.session_state["preview_1200"] = text[:1200]
+        st.session_state["preview_600"] = text[:600]
         st.success("✅ Resume parsed successfully!")
     except Exception as e:
         st.error(f"❌ Parsing failed: {e}")
@@ -105,22 +180,22 @@ if uploaded_file and st.button("🔍 Parse Resume"):
 if st.session_state["parsed"]:
     parsed = st.session_state["parsed"]
     st.subheader("📑 Resume Preview")
-    st.text_area("Extracted Text (preview)", parsed.get("text", "")[:1200], height=260)
+    st.text_area("Extracted Text (preview)", st.session_state["preview_1200"], height=260)
 
     if st.button("📊 Compute ATS Score"):
         resume_text = parsed.get("text", "")
-        score, details = ats_score.score_resume(resume_text, jd_text or "")
+        score, details = _cached_score(resume_text, jd_text or "")
         st.session_state["ats"] = (score, details)
         st.metric("Estimated ATS Score", f"{score}%")
         st.json(details)
 
     if st.button("✨ Enhance Resume (Azure GPT)"):
-        resume_text = parsed.get("text", "")
-        job_keywords = ats_score.extract_job_keywords(jd_text or "", top_n=20)
+        job_keywords = _cached_kw(jd_text or "", 20)
         try:
             with st.spinner("🚀 Enhancing resume using Azure GPT..."):
-                enhanced = gpt_client.enhance_resume_text(resume_text, job_keywords)
+                enhanced = enhance_by_section(parsed, job_keywords, stream=True)
                 st.session_state["enhanced_text"] = enhanced
+                st.session_state["enhanced_preview_600"] = enhanced[:600]
                 st.success("🎉 Enhancement complete!")
         except Exception as e:
             st.error(f"❌ Enhancement failed: {e}")
@@ -131,24 +206,21 @@ if st.session_state["parsed"]:
 if st.session_state.get("enhanced_text"):
     st.subheader("🔄 Before / After Comparison")
     col1, col2 = st.columns(2)
-    col1.text_area("Original", st.session_state["parsed"].get("text", "")[:600], height=300)
-    col2.text_area("Enhanced", st.session_state["enhanced_text"][:600], height=300)
+    col1.text_area("Original", st.session_state["preview_600"], height=300)
+    col2.text_area("Enhanced", st.session_state["enhanced_preview_600"], height=300)
 
     enhanced_text = st.session_state["enhanced_text"]
 
     # Adaptive Layout Application
     try:
-        with open("templates/sample_template.json", "r", encoding="utf-8") as f:
-            template = json.load(f)
-        mapped = map_text_to_template(enhanced_text, template)
-        pdf_data = generate_resume_pdf(json.dumps(mapped, ensure_ascii=False))
+        pdf_data = _build_pdf(enhanced_text, "templates/sample_template.json")
         st.success("🧠 Adaptive one-page layout applied successfully!")
     except Exception as e:
         st.warning(f"⚠️ Adaptive layout failed, using fallback format. ({e})")
         try:
-            pdf_data = render_fallback_pdf(enhanced_text)
+            pdf_data = _build_fallback_pdf(enhanced_text)
         except Exception:
-            pdf_data = text_to_pdf_bytes(enhanced_text)
+            pdf_data = _build_text_pdf(enhanced_text)
 
     # Download buttons
     txt_data = enhanced_text.encode("utf-8")
@@ -157,6 +229,45 @@ if st.session_state.get("enhanced_text"):
     st.download_button("📄 Download Enhanced (PDF)", data=pdf_data,
                        file_name="enhanced_resume.pdf", mime="application/pdf")
 
+# -----------------------------
+# Batch Mode (many resumes, Azure Batch API)
+# -----------------------------
+with st.expander("📦 Batch Mode — enhance many resumes (Azure Batch API)"):
+    st.caption("Jobs run asynchronously on Azure and may take minutes to hours; requires a batch deployment.")
+    batch_files = st.file_uploader("Upload Resumes (PDF only)", type=["pdf"],
+                                   accept_multiple_files=True, key="batch_files")
+    if batch_files and st.button(f"📦 Process {len(batch_files)} resumes (batch)"):
+        try:
+            from src import gpt_client
+            with st.spinner("⏳ Submitting Azure batch job..."):
+                texts = [parser.parse_resume(f) for f in batch_files]
+                job_keywords = _cached_kw(jd_text or "", 20)
+                batch_id = gpt_client.submit_resume_batch(texts, [job_keywords] * len(texts))
+            # the job outlives this run; keep its id so later reruns can check on it
+            st.session_state["batch_job"] = {"id": batch_id, "names": [f.name for f in batch_files]}
+        except Exception as e:
+            st.error(f"❌ Batch submission failed: {e}")
+
+    job = st.session_state.get("batch_job")
+    if job:
+        st.info(f"🕒 Batch job `{job['id']}` submitted for {len(job['names'])} resumes.")
+        if st.button("🔄 Refresh batch status"):
+            try:
+                from src import gpt_client
+                status, results = gpt_client.get_resume_batch(job["id"], len(job["names"]))
+                if results is None:
+                    st.info(f"⏳ Batch status: {status}. Check again later.")
+                else:
+                    zip_buffer = io.BytesIO()
+                    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+                        for name, enhanced in zip(job["names"], results):
+                            zf.writestr(os.path.splitext(name)[0] + "_enhanced.txt", enhanced)
+                    st.success(f"🎉 Batch complete: {sum(1 for r in results if r)}/{len(results)} resumes enhanced.")
+                    st.download_button("⬇️ Download Enhanced (ZIP)", data=zip_buffer.getvalue(),
+                                       file_name="enhanced_resumes.zip", mime="application/zip")
+            except Exception as e:
+                st.error(f"❌ Batch enhancement failed: {e}")
+
 # -----------------------------
 # Footer
 # -----------------------------
@@ -16,8 +16,12 @@ Uses RapidFuzz for fuzzy matching (fast).
 """
 
 import re
+import heapq
+from collections import Counter
 from typing import List, Dict, Tuple
-from rapidfuzz import fuzz, process
+import numpy as np
+from rapidfuzz import fuzz
+from rapidfuzz.process import cdist
 
 # ----- Configurable weights -----
 WEIGHTS = {
@@ -38,15 +42,30 @@ FORMAT_PENALTIES = {
     "has_cols": 0.10     # simple heuristic for columns
 }
 
+# ----- Precompiled patterns -----
+_RE_PUNCT = re.compile(r"[^\w\s\+\#\.]")
+_RE_WS = re.compile(r"\s+")
+_RE_WORD = re.compile(r"\w+")
+_RE_MULTISPACE = re.compile(r"\s{2,}")
+_RE_IMG = re.compile(r"\b(image|figure|photo|logo)\b", re.IGNORECASE)
+_RE_HEADING = re.compile(r"^\s*([A-Za-z ]{3,30})\s*$")
+# ASCII fast path for _RE_PUNCT: the same characters mapped to a space via str.translate
+_ASCII_PUNCT_TABLE = {i: " " for i in range(128) if _RE_PUNCT.match(chr(i))}
+
+# very simple stopword list for JD keyword extraction
+_STOP = frozenset({"with","that","this","from","will","have","your","you","the","and","for","our","be","are","or"})
+
 # small utility functions
 def _clean_text(text: str) -> str:
     if not text:
         return ""
     t = text.lower()
     # remove many punctuation but keep +/# for skills like c++
-    t = re.sub(r"[^\w\s\+\#\.]", " ", t)
-    t = re.sub(r"\s+", " ", t).strip()
-    return t
+    if t.isascii():
+        t = t.translate(_ASCII_PUNCT_TABLE)
+    else:
+        t = _RE_PUNCT.sub(" ", t)
+    return " ".join(t.split())
 
 def extract_job_keywords(job_text: str, top_n: int = 20) -> List[str]:
     """
@@ -56,18 +75,12 @@ def extract_job_keywords(job_text: str, top_n: int = 20) -> List[str]:
     if not job_text:
         return []
     txt = _clean_text(job_text)
-    # split and count tokens ignoring short tokens
-    tokens = [t for t in re.split(r"\s+", txt) if len(t) > 2]
-    freq = {}
-    for t in tokens:
-        freq[t] = freq.get(t, 0) + 1
-    # sort by frequency then prefer known skill-like tokens (contains digits/+ or common tech words)
-    sorted_tokens = sorted(freq.items(), key=lambda kv: (-kv[1], kv[0]))
-    keywords = [k for k, _v in sorted_tokens][:top_n]
-    # further filter out common stopwords (very simple)
-    stop = {"with","that","this","from","will","have","your","you","the","and","for","our","be","are","or"}
-    keywords = [k for k in keywords if k not in stop]
-    return keywords
+    # split and count tokens ignoring short tokens and stopwords
+    tokens = [t for t in _RE_WS.split(txt) if len(t) > 2 and t not in _STOP]
+    freq = Counter(tokens)
+    # top_n by frequency, ties broken alphabetically
+    top = heapq.nsmallest(top_n, freq.items(), key=lambda kv: (-kv[1], kv[0]))
+    return [k for k, _v in top]
 
 def _section_presence_score(sections_dict: dict) -> float:
     """
@@ -85,29 +98,36 @@ def _section_presence_score(sections_dict: dict) -> float:
             present += 1
     return present / total
 
-def _keyword_match_score(resume_text: str, job_keywords: List[str]) -> float:
+def _keyword_match_score(resume_text: str, job_keywords: List[str], _rtext: str = None) -> float:
     """
     Weighted keyword match using fuzzy matching.
     Returns a fraction in [0,1] representing how many job keywords are present.
+    `_rtext` may carry an already-cleaned resume text to skip re-cleaning.
     """
     if not job_keywords:
         return 0.0
-    rtext = _clean_text(resume_text)
+    rtext = _rtext if _rtext is not None else _clean_text(resume_text)
+    tokens_set = set(rtext.split())
     found = 0
+    remaining = []
     for kw in job_keywords:
-        if not kw:
-            continue
-        kw_clean = _clean_text(kw)
-        # direct containment
-        if kw_clean in rtext:
-            found += 1
+        kc = _clean_text(kw)
+        if not kc:
             continue
-        # fuzzy fallback: token-level fuzzy match
-        # check top matches from resume tokens
-        tokens = list(set(re.split(r"\s+", rtext)))
-        best = process.extractOne(kw_clean, tokens, scorer=fuzz.partial_ratio)
-        if best and best[1] >= 85:
+        # direct containment: hash probe for single tokens, substring scan only for phrases
+        if " " in kc:
+            hit = kc in rtext
+        else:
+            hit = kc in tokens_set
+        if hit:
             found += 1
+        else:
+            remaining.append(kc)
+    # fuzzy fallback: score all remaining keywords against all resume tokens in one call
+    tokens = list(tokens_set)
+    if remaining and tokens:
+        scores = cdist(remaining, tokens, scorer=fuzz.partial_ratio, score_cutoff=85, workers=-1)
+        found += int(np.count_nonzero(scores.max(axis=1) >= 85))
     return found / len(job_keywords)
 
 def _title_similarity_score(resume_text: str, job_text: str) -> float:
@@ -119,12 +139,17 @@ def _title_similarity_score(resume_text: str, job_text: str) -> float:
         return 0.0
     job_lines = [l.strip() for l in job_text.splitlines() if l.strip()][:5]
     # combine into single search string
-    hint = " ".join(job_lines)[:200]
+    hint = _clean_text(" ".join(job_lines)[:200])
     rlines = [l.strip() for l in resume_text.splitlines() if l.strip()][:20]
+    if not hint:
+        return 0.0
     best_score = 0
     for rl in rlines:
-        # fuzzy match
-        s = fuzz.partial_ratio(_clean_text(rl), _clean_text(hint))
+        rcl = _clean_text(rl)
+        if not rcl:
+            continue
+        # fuzzy match; score_cutoff lets rapidfuzz bail out on lines that can't beat the best
+        s = fuzz.partial_ratio(rcl, hint, score_cutoff=best_score)
         if s > best_score:
             best_score = s
     # map 0-100 to 0-1
@@ -143,19 +168,29 @@ def _formatting_score(resume_text: str) -> float:
     text = resume_text
     score = 1.0
 
+    # single pass over non-empty lines, keeping running counters
+    total = col_like = short_lines = 0
+    for l in text.splitlines():
+        ls = l.strip()
+        if not ls:
+            continue
+        total += 1
+        if len(ls) < 30:
+            short_lines += 1
+        # plain double-space check first; regex only for tab-style runs
+        if ("  " in l or _RE_MULTISPACE.search(l)) and len(l.split()) > 2:
+            col_like += 1
+
     # detect possible table (many lines with lots of multiple spaces and tabs)
-    lines = [l for l in text.splitlines() if l.strip()]
-    col_like = sum(1 for l in lines if re.search(r"\s{2,}", l) and len(l.split()) > 2)
-    if len(lines) > 0 and (col_like / len(lines)) > 0.15:
+    if total > 0 and (col_like / total) > 0.15:
         score -= FORMAT_PENALTIES["has_table"]
 
     # detect "image"/"figure" markers
-    if re.search(r"\b(image|figure|photo|logo)\b", text.lower()):
+    if _RE_IMG.search(text):
         score -= FORMAT_PENALTIES["has_image"]
 
     # penalty if many very-short lines (possible columns)
-    short_lines = sum(1 for l in lines if len(l.strip()) < 30)
-    if len(lines) > 0 and (short_lines / len(lines)) > 0.45:
+    if total > 0 and (short_lines / total) > 0.45:
         score -= FORMAT_PENALTIES["has_cols"]
 
     return max(0.0, min(1.0, score))
@@ -166,7 +201,7 @@ def _length_score(resume_text: str) -> float:
     """
     if not resume_text:
         return 0.0
-    words = len(re.findall(r"\w+", resume_text))
+    words = sum(1 for _ in _RE_WORD.finditer(resume_text))
     if words < 150:
         return 0.4
     if words <= 800:
@@ -181,17 +216,19 @@ def score_resume(resume_text: str, job_text: str) -> Tuple[int, Dict]:
     details includes component scores and suggestions.
     """
     job_keywords = extract_job_keywords(job_text, top_n=25)
+    # clean the resume once and share it with the scorers below
+    rtext = _clean_text(resume_text)
     # try to extract sections minimally (we expect the extractor to be used in app)
     # but we will do a naive detection here: look for section headings
     sections = {}
     for line in resume_text.splitlines():
-        m = re.match(r"^\s*([A-Za-z ]{3,30})\s*$", line)
+        m = _RE_HEADING.match(line)
         if m:
             heading = m.group(1).strip()
             if heading.lower() in EXPECTED_SECTIONS:
                 sections[heading] = True
 
-    k_score = _keyword_match_score(resume_text, job_keywords)
+    k_score = _keyword_match_score(resume_text, job_keywords, _rtext=rtext)
     s_score = _section_presence_score(sections)
     t_score = _title_similarity_score(resume_text, job_text)
     f_score = _formatting_score(resume_text)
@@ -211,7 +248,7 @@ def score_resume(resume_text: str, job_text: str) -> Tuple[int, Dict]:
     # suggestions: simple heuristics
     suggestions = []
     if k_score < 0.5 and job_keywords:
-        missing = [kw for kw in job_keywords if kw.lower() not in _clean_text(resume_text)]
+        missing = [kw for kw in job_keywords if kw.lower() not in rtext]
         suggestions.append(
             f"Add or mirror top job keywords: {', '.join(missing[:8])} (do not keyword-stuff; add naturally)."
         )
@@ -7,7 +7,8 @@ Cleaner extractor for resume text.
 """
 
 import re
-from typing import Dict, List, Union
+from functools import lru_cache
+from typing import Dict, List, Optional, Union
 
 SECTION_KEYWORDS = [
     "summary", "profile",
@@ -18,13 +19,56 @@ SECTION_KEYWORDS = [
     "languages", "internship"
 ]
 
+
+def _trie_pattern(words: List[str]) -> str:
+    """
+    Build a regex alternation with shared prefixes factored out
+    (e.g. "skills|summary" -> "s(?:kills|ummary)") so non-matching lines fail early.
+    """
+    trie: Dict[str, dict] = {}
+    for w in words:
+        node = trie
+        for ch in w.lower():
+            node = node.setdefault(ch, {})
+        node[""] = {}  # end-of-word marker
+
+    def emit(node: dict) -> str:
+        alts = [re.escape(ch) + emit(sub) for ch, sub in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        optional = "" in node
+        if len(alts) == 1 and not optional:
+            return alts[0]
+        group = "(?:" + "|".join(alts) + ")"
+        return group + "?" if optional else group
+
+    return emit(trie)
+
+
 HEADING_LINE_RE = re.compile(
-    r"^\s*(%s)\s*:?\s*$" % "|".join(re.escape(s) for s in SECTION_KEYWORDS),
+    r"^\s*(%s)\s*:?\s*$" % _trie_pattern(SECTION_KEYWORDS),
     flags=re.IGNORECASE | re.MULTILINE
 )
+# exact-string heading lookup for extract_sections; HEADING_LINE_RE stays for
+# callers that search whole texts and for non-ASCII lines (IGNORECASE folding)
+_HEAD_TITLE = {k.lower(): k.title() for k in SECTION_KEYWORDS}
+
+# precompiled helpers for the cleaning / skill paths
+# every candidate separator (bullets, pipes, ; / tab - newline) mapped to "," in one pass
+_CAND_TRANS = str.maketrans({"\u2022": ",", "|": ",", ";": ",", "/": ",", "\t": ",", "-": ",", "\n": ","})
+_STRIP_EDGES_RE = re.compile(r"^[^\w\+\#]+|[^\w\+\#]+$")
+# ASCII characters _STRIP_EDGES_RE trims, so ASCII tokens can use str.strip instead
+_EDGE_CHARS = "".join(c for c in map(chr, range(128)) if _STRIP_EDGES_RE.fullmatch(c))
+_EMAIL_RE = re.compile(r"\S+@\S+")
+_PHONE_RE = re.compile(r"\+?\d[\d\-\s\(\)]{4,}\d")
+_HEADER_SPLIT_RE = re.compile(r"[,\|/;:()\t\-]")
+_WORD_RE = re.compile(r"[A-Za-z\+\#\.]{2,}")
+_FINDALL_RE = re.compile(r"[A-Za-z\+\#\.\-]{2,}")
+_ALNUM_RE = re.compile(r"[A-Za-z0-9]")
+_TRAIL_PUNCT_RE = re.compile(r"[^\w\s\+\#\.\-]$")
 
 # expand noise words with places, common resume words, and obvious garbage
-NOISE_WORDS = set(map(str.lower, [
+NOISE_WORDS = frozenset(map(str.lower, [
     "the","and","with","for","in","on","a","an","to","of","by","from",
     "experience","skills","education","profile","projects","professional",
     "summary","certifications","languages","internship","worked","work",
@@ -33,13 +77,18 @@ NOISE_WORDS = set(map(str.lower, [
     "matriculation","fsc"
 ]))
 
-PRIORITY_SKILLS = {
+PRIORITY_SKILLS = frozenset({
     "python","sql","excel","aws","azure","docker","kubernetes","javascript",
     "react","node","java","c++","c#","git","linux","powerbi","tableau",
     "data analysis","machine learning","nlp","deep learning","rest","api",
     "supply chain","procurement","inventory","logistics","communication",
     "project management","teamwork","problem solving","leadership"
-}
+})
+
+# one hash probe classifies a lowercased candidate as noise / priority skill / neither
+_NOISE, _PRIORITY = 1, 2
+_TOKEN_CLASS = dict.fromkeys(PRIORITY_SKILLS, _PRIORITY)
+_TOKEN_CLASS.update(dict.fromkeys(NOISE_WORDS, _NOISE))
 
 
 def extract_sections(text: str) -> Dict[str, str]:
@@ -49,9 +98,18 @@ def extract_sections(text: str) -> Dict[str, str]:
     lines = text.splitlines()
     headings_positions = []
     for i, line in enumerate(lines):
-        m = HEADING_LINE_RE.match(line)
-        if m:
-            heading = m.group(1).strip().title()
+        key = line.strip()
+        if not key:
+            continue
+        # mirrors HEADING_LINE_RE's "\s*:?\s*$" tail: one optional colon, then spaces
+        if key[-1] == ":":
+            key = key[:-1].rstrip()
+        heading = _HEAD_TITLE.get(key.lower())
+        if heading is None and not key.isascii():
+            m = HEADING_LINE_RE.match(line)
+            if m:
+                heading = m.group(1).strip().title()
+        if heading is not None:
             headings_positions.append((i, heading))
 
     if not headings_positions:
@@ -64,15 +122,15 @@ def extract_sections(text: str) -> Dict[str, str]:
         end = len(lines)
         if idx + 1 < len(headings_positions):
             end = headings_positions[idx + 1][0]
-        body_lines = lines[start:end]
         cleaned = []
-        for bl in body_lines:
-            s = bl.strip()
+        # walk the shared line list by index instead of slicing a copy per section
+        for i in range(start, end):
+            # split()/join collapses whitespace runs and trims the ends in C, no regex engine
+            s = " ".join(lines[i].split())
             if not s:
                 if cleaned and cleaned[-1] != "":
                     cleaned.append("")
             else:
-                s = re.sub(r"\s+", " ", s)
                 cleaned.append(s)
         body = "\n".join(cleaned).strip()
         if body:
@@ -81,46 +139,56 @@ def extract_sections(text: str) -> Dict[str, str]:
 
 
 def _split_candidates_from_text(text: str) -> List[str]:
-    text = re.sub(r"[•\u2022]", ",", text)
-    text = text.replace("|", ",")
-    tokens = re.split(r",|;|/|\n|\t|\u2022|-", text)
+    tokens = text.translate(_CAND_TRANS).split(",")
     cleaned = []
+    # hot names bound to locals for the per-token loop
+    edge_chars, strip_sub, append = _EDGE_CHARS, _STRIP_EDGES_RE.sub, cleaned.append
     for t in tokens:
         tok = t.strip()
         if not tok:
             continue
-        tok = re.sub(r"^[^\w\+\#]+|[^\w\+\#]+$", "", tok)
-        tok = re.sub(r"\s+", " ", tok)
+        if tok.isascii():
+            tok = tok.strip(edge_chars)
+        else:
+            tok = strip_sub("", tok)
+        tok = " ".join(tok.split())
         if len(tok) < 2:
             continue
-        cleaned.append(tok)
+        append(tok)
     return cleaned
 
 
-def _header_tokens(text: str, max_lines: int = 8) -> set:
+@lru_cache(maxsize=32)
+def _header_tokens(text: str, max_lines: int = 8) -> frozenset:
     """
     Return a set of tokens from the top lines of the resume (likely name/contact/company)
-    so we can filter them from skills.
+    so we can filter them from skills. Cached per text, since callers may repeat it.
     """
+    if not text:
+        return frozenset()
     lines = text.splitlines()
     top = lines[:max_lines]
     tokens = set()
     for line in top:
         # remove emails/phones and split words
-        ln = re.sub(r"\S+@\S+","", line)
-        ln = re.sub(r"\+?\d[\d\-\s\(\)]{4,}\d","", ln)
-        parts = re.split(r"[,\|/;:()\t\-]", ln)
+        ln = _EMAIL_RE.sub("", line)
+        ln = _PHONE_RE.sub("", ln)
+        parts = _HEADER_SPLIT_RE.split(ln)
         for p in parts:
             p = p.strip()
             if not p:
                 continue
             # keep words of reasonable length
-            for w in re.findall(r"[A-Za-z\+\#\.]{2,}", p):
+            for w in _WORD_RE.findall(p):
                 tokens.add(w.lower())
-    return tokens
+    return frozenset(tokens)
 
 
-def extract_skills(sections: Union[Dict[str, str], str]) -> List[str]:
+def extract_skills(sections: Union[Dict[str, str], str], resume_top_text: Optional[str] = None) -> List[str]:
+    """
+    `resume_top_text` is the resume's header region (name/contact lines); its tokens are
+    filtered out of the skills. Without it the top of the skill text itself is used.
+    """
     if isinstance(sections, dict):
         skill_text = ""
         # prefer explicit skills section
@@ -132,25 +200,34 @@ def extract_skills(sections: Union[Dict[str, str], str]) -> List[str]:
             skill_text = "\n".join(sections.values())
     else:
         skill_text = sections
+    if not skill_text or skill_text.isspace():
+        # nothing to split; skip the header scan entirely
+        return []
 
     # header-aware filtering
-    header_tokens = _header_tokens(skill_text)
+    header_tokens = _header_tokens(resume_top_text if resume_top_text is not None else skill_text)
 
     candidates = _split_candidates_from_text(skill_text)
     if not candidates:
-        candidates = re.findall(r"[A-Za-z\+\#\.\-]{2,}", skill_text)
+        candidates = _FINDALL_RE.findall(skill_text)
 
-    normalized = []
+    # prioritize recognized skills from PRIORITY_SKILLS: partitioned as we go, order kept within each
+    priority_list = []
+    normal_list = []
     seen = set()
+    # hot names bound to locals for the per-candidate loop
+    classify, alnum_search, seen_add, trail_sub = _TOKEN_CLASS.get, _ALNUM_RE.search, seen.add, _TRAIL_PUNCT_RE.sub
     for tok in candidates:
+        # strip/lower once per candidate; the lowered form drives every check below
         key = tok.strip()
         low = key.lower()
+        cls = classify(low)
 
         # remove tokens that match header tokens (names, city, email parts)
         if low in header_tokens:
             continue
         # filter out noise words
-        if low in NOISE_WORDS:
+        if cls == _NOISE:
             continue
         # remove single-letter or numeric tokens
         if len(low) <= 1:
@@ -158,23 +235,17 @@ def extract_skills(sections: Union[Dict[str, str], str]) -> List[str]:
         if low.isdigit():
             continue
         # remove tokens that are mostly uppercase short words unless priority
-        if key.isupper() and len(key) <= 3 and low not in PRIORITY_SKILLS:
+        if key.isupper() and len(key) <= 3 and cls != _PRIORITY:
             continue
         # remove tokens that are just punctuation
-        if not re.search(r"[A-Za-z0-9]", key):
+        if not alnum_search(key):
             continue
         # final dedupe
         if low not in seen:
-            seen.add(low)
-            # keep original capitalization if it looks like an acronym or mixed-case
-            normalized.append(key.strip())
-
-    # prioritize recognized skills from PRIORITY_SKILLS
-    priority_list = [t for t in normalized if t.lower() in PRIORITY_SKILLS]
-    normal_list = [t for t in normalized if t.lower() not in PRIORITY_SKILLS]
+            seen_add(low)
+            # keep original capitalization if it looks like an acronym or mixed-case;
+            # cleanup trailing punctuation
+            (priority_list if cls == _PRIORITY else normal_list).append(trail_sub("", key).strip())
 
-    result = priority_list + normal_list
-    # cleanup trailing punctuation
-    result = [re.sub(r"[^\w\s\+\#\.\-]$", "", r).strip() for r in result]
     # limit to 60
-    return result[:60]
+    return (priority_list + normal_list)[:60]
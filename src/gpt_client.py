@@ -4,23 +4,49 @@ Reads configuration from Streamlit secrets or environment variables:
   - AZURE_FOUNDRY_ENDPOINT
   - AZURE_FOUNDRY_KEY
   - AZURE_DEPLOYMENT_NAME
+Optional secondary endpoint, used when the primary stays throttled/unreachable:
+  - AZURE_FOUNDRY_FALLBACK_ENDPOINT
+  - AZURE_FOUNDRY_FALLBACK_KEY
+  - AZURE_FALLBACK_DEPLOYMENT_NAME (defaults to AZURE_DEPLOYMENT_NAME)
+Optional tuning:
+  - AZURE_MAX_CONCURRENCY (parallel section rewrites, default 6)
 """
 
 import os
 import json
+import math
 import time
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 import requests
 
 API_VERSION = os.getenv("AZURE_API_VERSION", "2025-01-01-preview")
 DEBUG = bool(os.getenv("GPT_CLIENT_DEBUG", ""))
+MAX_BACKOFF = 20
+# cap on in-flight requests for the per-section fan-out (keeps bursts under Azure rate limits)
+MAX_CONCURRENCY = int(os.getenv("AZURE_MAX_CONCURRENCY", "6"))
+
+
+# One pooled keep-alive session so repeated calls reuse the TCP/TLS connection.
+# Retries are handled in _post_with_retry, so the adapter itself doesn't retry.
+_SESSION = requests.Session()
+_SESSION.mount("https://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0))
+
+
+class AzureUnavailableError(RuntimeError):
+    """Raised when an endpoint keeps returning 429/5xx or network errors after all retries."""
 
 
 # -------------------------
 # Configuration Loader
 # -------------------------
+@lru_cache(maxsize=1)
 def _get_config():
-    """Load Azure config from Streamlit secrets or environment."""
+    """
+    Load Azure config from Streamlit secrets or environment.
+    Cached for the process; call _get_config.cache_clear() after rotating keys.
+    """
     endpoint = key = deployment = None
     try:
         import streamlit as st
@@ -43,6 +69,27 @@ def _get_config():
     return {"endpoint": endpoint.rstrip("/"), "key": key, "deployment": deployment}
 
 
+def _get_fallback_config(primary: Dict[str, str]) -> Optional[Dict[str, str]]:
+    """Load the optional secondary endpoint; returns None when not configured."""
+    endpoint = key = deployment = None
+    try:
+        import streamlit as st
+        cfg = st.secrets
+        endpoint = cfg.get("AZURE_FOUNDRY_FALLBACK_ENDPOINT")
+        key = cfg.get("AZURE_FOUNDRY_FALLBACK_KEY")
+        deployment = cfg.get("AZURE_FALLBACK_DEPLOYMENT_NAME")
+    except Exception:
+        pass
+
+    endpoint = endpoint or os.getenv("AZURE_FOUNDRY_FALLBACK_ENDPOINT")
+    key = key or os.getenv("AZURE_FOUNDRY_FALLBACK_KEY")
+    deployment = deployment or os.getenv("AZURE_FALLBACK_DEPLOYMENT_NAME") or primary["deployment"]
+
+    if not (endpoint and key):
+        return None
+    return {"endpoint": endpoint.rstrip("/"), "key": key, "deployment": deployment}
+
+
 # -------------------------
 # Helper: Build Azure URL
 # -------------------------
@@ -53,27 +100,40 @@ def _build_url(endpoint: str, deployment: str, api_version: str = API_VERSION) -
 # -------------------------
 # Helper: API Request with Retry
 # -------------------------
-def _do_request(payload: Dict[str, Any], retries: int = 3) -> Dict[str, Any]:
-    cfg = _get_config()
-    endpoint, key, deployment = cfg["endpoint"], cfg["key"], cfg["deployment"]
+def _backoff(attempt: int, resp: Optional[requests.Response] = None) -> float:
+    """Exponential backoff (2s, 4s, 8s, ... capped), honouring Retry-After when sent."""
+    if resp is not None:
+        try:
+            retry_after = float(resp.headers.get("Retry-After", ""))
+        except ValueError:
+            retry_after = None
+        # a negative or nan/inf header would make time.sleep raise; use the exponential delay
+        if retry_after is not None and math.isfinite(retry_after):
+            return max(0.0, min(retry_after, MAX_BACKOFF))
+    return min(2 * (2 ** attempt), MAX_BACKOFF)
+
 
-    url = _build_url(endpoint, deployment)
-    headers = {"Content-Type": "application/json", "api-key": key}
+def _post_with_retry(cfg: Dict[str, str], payload: Dict[str, Any], retries: int, stream: bool = False):
+    url = _build_url(cfg["endpoint"], cfg["deployment"])
+    headers = {"Content-Type": "application/json", "api-key": cfg["key"]}
 
     for attempt in range(retries):
+        last = attempt + 1 == retries
         try:
-            resp = requests.post(url, headers=headers, json=payload, timeout=60)
+            resp = _SESSION.post(url, headers=headers, json=payload, timeout=60, stream=stream)
             if DEBUG:
                 print(f"[DEBUG] Azure call status {resp.status_code}")
 
             if resp.status_code == 200:
-                return resp.json()
+                # streaming callers read the open response themselves
+                return resp if stream else resp.json()
 
             # Handle rate limit or temporary errors
             if resp.status_code in (429, 500, 502, 503):
-                wait_time = (attempt + 1) * 2
-                print(f"⚠️ Retry {attempt+1}/{retries} after {wait_time}s: {resp.status_code}")
-                time.sleep(wait_time)
+                if not last:
+                    wait_time = _backoff(attempt, resp)
+                    print(f"⚠️ Retry {attempt+1}/{retries} after {wait_time}s: {resp.status_code}")
+                    time.sleep(wait_time)
                 continue
 
             try:
@@ -85,16 +145,32 @@ def _do_request(payload: Dict[str, Any], retries: int = 3) -> Dict[str, Any]:
 
         except requests.exceptions.RequestException as e:
             print(f"⚠️ Network error ({attempt+1}/{retries}): {e}")
-            time.sleep((attempt + 1) * 2)
+            if not last:
+                time.sleep(_backoff(attempt))
+
+    raise AzureUnavailableError("❌ Azure GPT service unreachable after multiple retries.")
+
 
-    raise RuntimeError("❌ Azure GPT service unreachable after multiple retries.")
+def _do_request(payload: Dict[str, Any], retries: int = 3, stream: bool = False):
+    cfg = _get_config()
+    try:
+        return _post_with_retry(cfg, payload, retries, stream)
+    except AzureUnavailableError:
+        fallback = _get_fallback_config(cfg)
+        if not fallback:
+            raise
+        print("⚠️ Primary Azure endpoint unavailable, trying fallback endpoint.")
+        return _post_with_retry(fallback, payload, retries, stream)
 
 
 # -------------------------
 # Core: Chat Completion
 # -------------------------
-def chat_completion(messages: List[Dict[str, str]], max_tokens: int = 400, temperature: float = 0.6) -> str:
+def chat_completion(messages: List[Dict[str, str]], max_tokens: int = 400, temperature: float = 0.6,
+                    response_format: Optional[Dict[str, str]] = None) -> str:
     payload = {"messages": messages, "max_tokens": max_tokens, "temperature": temperature}
+    if response_format:
+        payload["response_format"] = response_format
     result = _do_request(payload)
 
     try:
@@ -107,11 +183,47 @@ def chat_completion(messages: List[Dict[str, str]], max_tokens: int = 400, tempe
         return json.dumps(result)
 
 
+def stream_chat_completion(messages: List[Dict[str, str]], max_tokens: int = 400,
+                           temperature: float = 0.6) -> Iterator[str]:
+    """Yields content deltas as Azure streams them (server-sent events)."""
+    payload = {"messages": messages, "max_tokens": max_tokens, "temperature": temperature, "stream": True}
+    resp = _do_request(payload, stream=True)
+    with resp:
+        for raw in resp.iter_lines(decode_unicode=True):
+            if not raw or not raw.startswith("data:"):
+                continue
+            data = raw[5:].strip()
+            if data == "[DONE]":
+                break
+            try:
+                choices = json.loads(data).get("choices", [])
+            except ValueError:
+                continue
+            # the first event may only carry content-filter results
+            if choices:
+                delta = (choices[0].get("delta") or {}).get("content")
+                if delta:
+                    yield delta
+
+
 # -------------------------
 # Business Logic: Resume Enhancement
 # -------------------------
-def enhance_resume_text(resume_text: str, job_keywords: Optional[List[str]] = None) -> str:
-    """Enhances resume text for clarity, grammar, and ATS keyword optimization."""
+# sections that always go to the model; anything else is only rewritten when it is long
+REWRITE_HEADINGS = frozenset({
+    "summary", "profile", "experience", "work experience", "professional experience",
+    "projects", "internship", "achievements",
+})
+MIN_REWRITE_CHARS = 300
+
+
+def needs_rewrite(heading: str, body: str) -> bool:
+    """True if a section is worth sending to the model (short lists like Languages are kept verbatim)."""
+    return heading.lower() in REWRITE_HEADINGS or len(body) > MIN_REWRITE_CHARS
+
+
+def _enhance_messages(resume_text: str, job_keywords: Optional[List[str]] = None) -> List[Dict[str, str]]:
+    """Build the system/user messages for a resume rewrite."""
     keywords = ", ".join(job_keywords) if job_keywords else "general professional skills"
 
     system_prompt = (
@@ -128,15 +240,210 @@ def enhance_resume_text(resume_text: str, job_keywords: Optional[List[str]] = No
     Return only the improved resume text.
     """
 
-    messages = [
+    return [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": user_prompt},
     ]
 
+
+def enhance_resume_text(resume_text: str, job_keywords: Optional[List[str]] = None) -> str:
+    """Enhances resume text for clarity, grammar, and ATS keyword optimization."""
+    messages = _enhance_messages(resume_text, job_keywords)
     enhanced = chat_completion(messages, max_tokens=1800, temperature=0.7)
     return enhanced.strip()
 
 
+def enhance_resume_text_stream(resume_text: str, job_keywords: Optional[List[str]] = None) -> Iterator[str]:
+    """Streaming variant of enhance_resume_text; yields the rewrite piece by piece."""
+    messages = _enhance_messages(resume_text, job_keywords)
+    yield from stream_chat_completion(messages, max_tokens=1800, temperature=0.7)
+
+
+def enhance_sections(sections: Dict[str, str], job_keywords: Optional[List[str]] = None,
+                     max_workers: int = MAX_CONCURRENCY) -> Dict[str, str]:
+    """Enhances each resume section concurrently; returns heading -> enhanced text in input order."""
+    items = [(h, body) for h, body in sections.items() if body and body.strip()]
+    if not items:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        futures = [(h, pool.submit(enhance_resume_text, body, job_keywords)) for h, body in items]
+        return {h: f.result() for h, f in futures}
+
+
+def enhance_sections_batch(sections: Dict[str, str], job_keywords: Optional[List[str]] = None) -> Dict[str, str]:
+    """
+    Enhances all resume sections in a single chat request.
+    The model is asked for a JSON object keyed by heading; raises ValueError if the
+    request is rejected or the reply can't be mapped back onto every input heading.
+    """
+    items = {h: body for h, body in sections.items() if body and body.strip()}
+    if not items:
+        return {}
+    keywords = ", ".join(job_keywords) if job_keywords else "general professional skills"
+
+    system_prompt = (
+        "You are a senior resume writer with 10+ years of experience improving professional resumes "
+        "for recruiters and ATS systems. Rewrite each section to improve clarity, tone, and keyword optimization. "
+        "Keep all factual information but make it more concise and result-oriented."
+    )
+
+    user_prompt = f"""
+    Resume sections as a JSON object (heading -> text):
+    {json.dumps(items, ensure_ascii=False)}
+
+    Please optimize for these keywords: {keywords}
+    Return only a JSON object with exactly the same headings, each mapped to the improved section text.
+    """
+
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+    try:
+        # JSON mode keeps the model from wrapping the object in prose
+        reply = chat_completion(messages, max_tokens=4000, temperature=0.7,
+                                response_format={"type": "json_object"})
+    except AzureUnavailableError:
+        raise
+    except RuntimeError as e:
+        # e.g. a deployment that rejects response_format; callers fall back per section
+        raise ValueError(f"Batched enhancement request rejected: {e}")
+    # tolerate replies wrapped in a ```json fence
+    reply = reply.strip().strip("`")
+    if reply.startswith("json"):
+        reply = reply[4:]
+    try:
+        data = json.loads(reply)
+    except ValueError:
+        raise ValueError("Batched enhancement reply is not valid JSON.")
+    if not isinstance(data, dict) or not all(isinstance(data.get(h), str) for h in items):
+        raise ValueError("Batched enhancement reply is missing sections.")
+    return {h: data[h].strip() for h in items}
+
+
+# -------------------------
+# Batch API: Multi-Resume Enhancement
+# -------------------------
+def _batch_url(endpoint: str, path: str, api_version: str = API_VERSION) -> str:
+    return f"{endpoint}/openai/{path}?api-version={api_version}"
+
+
+def submit_resume_batch(resumes: List[str], kws: Optional[List[List[str]]] = None) -> str:
+    """
+    Uploads a JSONL job to the Azure OpenAI Batch API (async, 24h window) and returns the
+    batch id without waiting; check on it with get_resume_batch.
+    The configured deployment must be a batch (global-batch) deployment.
+    """
+    kws = kws or [None] * len(resumes)
+    cfg = _get_config()
+    endpoint, deployment = cfg["endpoint"], cfg["deployment"]
+    headers = {"api-key": cfg["key"]}
+
+    lines = []
+    for i, (text, job_keywords) in enumerate(zip(resumes, kws)):
+        lines.append(json.dumps({
+            "custom_id": f"resume-{i}",
+            "method": "POST",
+            "url": "/chat/completions",
+            "body": {
+                "model": deployment,
+                "messages": _enhance_messages(text, job_keywords),
+                "max_tokens": 1800,
+                "temperature": 0.7,
+            },
+        }, ensure_ascii=False))
+    jsonl = "\n".join(lines).encode("utf-8")
+
+    # 1) upload input file
+    resp = _SESSION.post(
+        _batch_url(endpoint, "files"),
+        headers=headers,
+        data={"purpose": "batch"},
+        files={"file": ("resumes.jsonl", jsonl, "application/jsonl")},
+        timeout=60,
+    )
+    if resp.status_code not in (200, 201):
+        raise RuntimeError(f"❌ Batch file upload failed ({resp.status_code}): {resp.text}")
+    input_file_id = resp.json()["id"]
+
+    # 2) create batch job
+    resp = _SESSION.post(
+        _batch_url(endpoint, "batches"),
+        headers=headers,
+        json={"input_file_id": input_file_id, "endpoint": "/chat/completions", "completion_window": "24h"},
+        timeout=60,
+    )
+    if resp.status_code not in (200, 201):
+        raise RuntimeError(f"❌ Batch creation failed ({resp.status_code}): {resp.text}")
+    return resp.json()["id"]
+
+
+def get_resume_batch(batch_id: str, count: int) -> Tuple[str, Optional[List[str]]]:
+    """
+    One status check of a submitted batch. Returns (status, results): results is None until
+    the job has completed, then the `count` enhanced texts in input order.
+    Raises RuntimeError if the job failed, expired or was cancelled.
+    """
+    cfg = _get_config()
+    endpoint = cfg["endpoint"]
+    headers = {"api-key": cfg["key"]}
+
+    resp = _SESSION.get(_batch_url(endpoint, f"batches/{batch_id}"), headers=headers, timeout=60)
+    if resp.status_code != 200:
+        raise RuntimeError(f"❌ Batch status check failed ({resp.status_code}): {resp.text}")
+    batch = resp.json()
+    status = batch.get("status")
+    if DEBUG:
+        print(f"[DEBUG] Batch {batch_id} status {status}")
+    if status in ("failed", "expired", "cancelled"):
+        raise RuntimeError(f"❌ Batch {batch_id} ended with status '{status}'.")
+    if status != "completed":
+        return status, None
+
+    # download results and restore input order
+    output_file_id = batch.get("output_file_id")
+    if not output_file_id:
+        raise RuntimeError(f"❌ Batch {batch_id} completed without an output file.")
+    resp = _SESSION.get(_batch_url(endpoint, f"files/{output_file_id}/content"), headers=headers, timeout=120)
+    if resp.status_code != 200:
+        raise RuntimeError(f"❌ Batch output download failed ({resp.status_code}): {resp.text}")
+
+    results = [""] * count
+    for line in resp.text.splitlines():
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        idx = int(item.get("custom_id", "resume-").split("-")[-1] or -1)
+        if not 0 <= idx < len(results):
+            continue
+        body = (item.get("response") or {}).get("body") or {}
+        choices = body.get("choices", [])
+        if choices:
+            results[idx] = choices[0].get("message", {}).get("content", "").strip()
+    return status, results
+
+
+def enhance_resume_batch(resumes: List[str], kws: Optional[List[List[str]]] = None,
+                         poll_interval: float = 30.0, timeout: float = 24 * 3600) -> List[str]:
+    """
+    Blocking convenience for scripts: submit_resume_batch, then get_resume_batch every
+    `poll_interval` seconds until done. Interactive callers should store the batch id and
+    check on it later instead of blocking here.
+    """
+    if not resumes:
+        return []
+    batch_id = submit_resume_batch(resumes, kws)
+    deadline = time.time() + timeout
+    while True:
+        _, results = get_resume_batch(batch_id, len(resumes))
+        if results is not None:
+            return results
+        if time.time() > deadline:
+            raise RuntimeError(f"❌ Batch {batch_id} did not finish within {timeout:.0f}s.")
+        time.sleep(poll_interval)
+
+
 # -------------------------
 # Smoke Test (Local Run)
 # -------------------------
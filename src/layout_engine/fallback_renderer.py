@@ -6,6 +6,7 @@ with clean typography and spacing.
 """
 
 from io import BytesIO
+from typing import BinaryIO, Optional
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, HRFlowable
@@ -13,21 +14,8 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from reportlab.lib import colors
 
 
-def render_fallback_pdf(enhanced_text: str) -> bytes:
-    """
-    Generates a polished, one-page PDF version of the resume text.
-    Automatically adjusts spacing to fit within a single A4 page.
-    """
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=50,
-        leftMargin=50,
-        topMargin=50,
-        bottomMargin=40,
-    )
-
+def _build_styles():
+    """Sample stylesheet plus the fallback styles; built once at import."""
     styles = getSampleStyleSheet()
 
     # Define elegant fallback styles
@@ -74,6 +62,31 @@ def render_fallback_pdf(enhanced_text: str) -> bytes:
             spaceBefore=12,
         )
     )
+    return styles
+
+
+# styles are read-only during doc.build, so one stylesheet is shared by every export
+_STYLES = _build_styles()
+
+
+def render_fallback_pdf(enhanced_text: str, out: Optional[BinaryIO] = None) -> Optional[bytes]:
+    """
+    Generates a polished, one-page PDF version of the resume text.
+    Automatically adjusts spacing to fit within a single A4 page.
+    If `out` (a writable binary file-like) is given, the PDF is written straight
+    into it and None is returned; otherwise the PDF bytes are returned.
+    """
+    buffer = out if out is not None else BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        rightMargin=50,
+        leftMargin=50,
+        topMargin=50,
+        bottomMargin=40,
+    )
+
+    styles = _STYLES
 
     content = []
     lines = enhanced_text.splitlines()
@@ -97,6 +110,8 @@ def render_fallback_pdf(enhanced_text: str) -> bytes:
     content.append(Paragraph("Enhanced by AI Resume Enhancer © 2025", styles["FooterNote"]))
 
     doc.build(content)
+    if out is not None:
+        return None
     pdf_bytes = buffer.getvalue()
     buffer.close()
     return pdf_bytes
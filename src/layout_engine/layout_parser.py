@@ -23,7 +23,9 @@ import json
 import os
 import math
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
 
 # Try PyMuPDF first (best). Fall back to pdfplumber.
 try:
@@ -38,6 +40,12 @@ try:
 except Exception:
     _HAS_PDFPLUMBER = False
 
+# orjson is optional; fall back to stdlib json when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 
 
@@ -45,7 +53,9 @@ logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 # Helpers & Data Structures
 # -------------------------
 def _round_bbox(bbox: Tuple[float, float, float, float], precision: int = 2) -> Tuple[float, float, float, float]:
-    return tuple(round(x, precision) for x in bbox)
+    # unpacked rather than tuple(<generator>): no generator frame per call
+    x0, y0, x1, y1 = bbox
+    return (round(x0, precision), round(y0, precision), round(x1, precision), round(y1, precision))
 
 
 def _area(bbox: Tuple[float, float, float, float]) -> float:
@@ -64,22 +74,34 @@ def _y_center(bbox: Tuple[float, float, float, float]) -> float:
     return (y0 + y1) / 2.0
 
 
+def _bbox_array(blocks: List[Dict[str, Any]]) -> np.ndarray:
+    """Pack block bboxes into an (N, 4) float array so min/max/centers reduce in NumPy."""
+    return np.asarray([b["bbox"] for b in blocks], dtype=np.float64).reshape(-1, 4)
+
+
+def _bbox_union(bboxes: np.ndarray) -> Tuple[float, float, float, float]:
+    """Rounded bbox enclosing every row of an (N, 4) bbox array (N > 0)."""
+    xs, ys = bboxes[:, 0::2], bboxes[:, 1::2]
+    return _round_bbox((float(xs.min()), float(ys.min()), float(xs.max()), float(ys.max())), 2)
+
+
 # -------------------------
 # Core extraction functions
 # -------------------------
-def extract_with_fitz(pdf_path: str, page_number: int = 0) -> Dict[str, Any]:
+def _extract_fitz_page(page: "fitz.Page", font_intern: Dict[str, str]) -> Dict[str, Any]:
     """
-    Use PyMuPDF to extract text spans with font, size, and bbox.
-    Returns dict {page_width, page_height, blocks: [ {text, bbox, font, size, block_no, line_no, span_no} ] }
+    Span extraction for one already-loaded page. `font_intern` is shared across the pages of a
+    document so equal font names share one string.
     """
-    doc = fitz.open(pdf_path)
-    page = doc.load_page(page_number)
     page_rect = page.rect  # fitz.Rect
     page_w, page_h = float(page_rect.width), float(page_rect.height)
 
-    # get text as dict with spans
-    textpage = page.get_text("dict")  # contains blocks->lines->spans
+    # get text as dict with spans; image blocks are skipped below, so don't have
+    # MuPDF decode and embed them (ligature/whitespace flags stay as default)
+    textpage = page.get_text("dict", flags=fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES)
+
     blocks_out = []
+    append = blocks_out.append
     block_no = 0
     for b in textpage.get("blocks", []):
         # ignore images/other non-text blocks
@@ -87,24 +109,46 @@ def extract_with_fitz(pdf_path: str, page_number: int = 0) -> Dict[str, Any]:
             continue
         for line_no, line in enumerate(b.get("lines", [])):
             for span_no, span in enumerate(line.get("spans", [])):
-                bbox = (span["bbox"][0], span["bbox"][1], span["bbox"][2], span["bbox"][3])
-                item = {
-                    "text": span.get("text", ""),
-                    "font": span.get("font", ""),
+                text = span.get("text", "")
+                # skip empty before building the item
+                if not text.strip():
+                    continue
+                raw_font = span.get("font", "")
+                x0, y0, x1, y1 = span["bbox"][:4]
+                append({
+                    "text": text,
+                    "font": font_intern.setdefault(raw_font, raw_font),
                     "size": float(span.get("size", 0.0)),
-                    "bbox": _round_bbox(bbox, 2),
+                    "bbox": (round(x0, 2), round(y0, 2), round(x1, 2), round(y1, 2)),
                     "block_no": block_no,
                     "line_no": line_no,
                     "span_no": span_no,
-                }
-                # skip empty
-                if item["text"].strip():
-                    blocks_out.append(item)
+                })
         block_no += 1
 
     return {"page_width": page_w, "page_height": page_h, "blocks": blocks_out}
 
 
+def extract_with_fitz(pdf_path: str, page_number: int = 0) -> Dict[str, Any]:
+    """
+    Use PyMuPDF to extract text spans with font, size, and bbox.
+    Returns dict {page_width, page_height, blocks: [ {text, bbox, font, size, block_no, line_no, span_no} ] }
+    """
+    with fitz.open(pdf_path) as doc:
+        return _extract_fitz_page(doc.load_page(page_number), {})
+
+
+def extract_pages_with_fitz(pdf_path: str, page_numbers: Iterable[int]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Like extract_with_fitz for several pages, opening (and parsing the xref/fonts of) the
+    document once. Yields (page_number, page_dict) in the given order.
+    """
+    font_intern: Dict[str, str] = {}
+    with fitz.open(pdf_path) as doc:
+        for page_number in page_numbers:
+            yield page_number, _extract_fitz_page(doc.load_page(page_number), font_intern)
+
+
 def extract_with_pdfplumber(pdf_path: str, page_number: int = 0) -> Dict[str, Any]:
     """
     Fallback using pdfplumber: extract words and their bounding boxes.
@@ -116,12 +160,12 @@ def extract_with_pdfplumber(pdf_path: str, page_number: int = 0) -> Dict[str, An
         res["page_height"] = float(page.height)
         words = page.extract_words(use_text_flow=True)
         for i, w in enumerate(words):
-            bbox = (float(w["x0"]), float(w["top"]), float(w["x1"]), float(w["bottom"]))
             item = {
                 "text": w.get("text", ""),
                 "font": None,
                 "size": None,
-                "bbox": _round_bbox(bbox, 2),
+                "bbox": (round(float(w["x0"]), 2), round(float(w["top"]), 2),
+                         round(float(w["x1"]), 2), round(float(w["bottom"]), 2)),
                 "word_index": i,
             }
             if item["text"].strip():
@@ -129,95 +173,101 @@ def extract_with_pdfplumber(pdf_path: str, page_number: int = 0) -> Dict[str, An
     return res
 
 
-def group_blocks_into_zones(blocks: List[Dict[str, Any]], page_height: float, num_zones: int = 5) -> List[Dict[str, Any]]:
+def group_blocks_into_zones(blocks: List[Dict[str, Any]], page_height: float, num_zones: int = 5,
+                            bboxes: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
     """
     Simple heuristic: divide page vertically into `num_zones` slices and group spans by center Y coordinate.
     Returns list of zones with aggregated bbox and contained lines.
+    `bboxes` may pass in the packed _bbox_array(blocks) so it's only built once.
     """
-    # compute centers and assign
-    zones: List[Dict[str, Any]] = []
+    if not blocks:
+        return []
     band_height = page_height / float(num_zones)
-    # initialize
-    for i in range(num_zones):
-        zones.append({"zone_index": i, "y0": i * band_height, "y1": (i + 1) * band_height, "items": []})
-
-    for b in blocks:
-        cy = _y_center(b["bbox"])
-        idx = min(int(cy // band_height), num_zones - 1)
-        zones[idx]["items"].append(b)
+    # y centers -> zone index for every block at once
+    if bboxes is None:
+        bboxes = _bbox_array(blocks)
+    cy = (bboxes[:, 1] + bboxes[:, 3]) / 2.0
+    # clipped at both ends so spans above the page top (negative y) still land in a zone
+    zone_idx = np.clip((cy // band_height).astype(np.int64), 0, num_zones - 1)
 
     # summarize zone bboxes
     out = []
-    for z in zones:
-        items = z["items"]
-        if not items:
+    for i in range(num_zones):
+        members = np.flatnonzero(zone_idx == i)
+        if not members.size:
             continue
-        xs = [it["bbox"][0] for it in items] + [it["bbox"][2] for it in items]
-        ys = [it["bbox"][1] for it in items] + [it["bbox"][3] for it in items]
-        bbox = (min(xs), min(ys), max(xs), max(ys))
-        out.append({"zone_index": z["zone_index"], "bbox": _round_bbox(bbox, 2), "items": items})
+        items = [blocks[j] for j in members]
+        out.append({"zone_index": i, "bbox": _bbox_union(bboxes[members]), "items": items})
     return out
 
 
-def detect_head_and_sections(blocks: List[Dict[str, Any]], page_height: float) -> Dict[str, Any]:
+def detect_head_and_sections(blocks: List[Dict[str, Any]], page_height: float,
+                             bboxes: Optional[np.ndarray] = None) -> Dict[str, Any]:
     """
     Heuristic detection:
      - header: top-most zone with relatively small Y center (name/contact)
      - sections: headings detected by larger font sizes or lines that end with ':' or are short and uppercase-like
     Returns: {"header": {...}, "sections": [ {name, bbox, lines:[...]} ] }
+    `bboxes` may pass in the packed _bbox_array(blocks) so it's only built once.
     """
     if not blocks:
         return {"header": None, "sections": []}
 
     # sort blocks top-down (y increasing = lower on page in pdf coordinate systems; fitz uses top coords)
-    sorted_blocks = sorted(blocks, key=lambda b: b["bbox"][1])
-    # header candidate: take first N blocks within top 15% of page height
+    if bboxes is None:
+        bboxes = _bbox_array(blocks)
+    order = np.argsort(bboxes[:, 1], kind="stable")
+    sorted_blocks = [blocks[i] for i in order]
+    sorted_bboxes = bboxes[order]
+    # per-block bbox edges, computed once and reduced over the header prefix and each section run
+    x_lo = np.minimum(sorted_bboxes[:, 0], sorted_bboxes[:, 2])
+    x_hi = np.maximum(sorted_bboxes[:, 0], sorted_bboxes[:, 2])
+    y_lo = np.minimum(sorted_bboxes[:, 1], sorted_bboxes[:, 3])
+    y_hi = np.maximum(sorted_bboxes[:, 1], sorted_bboxes[:, 3])
+    # header candidate: the blocks within top 15% of page height (a prefix of the sorted blocks)
     threshold = page_height * 0.15
-    header_items = [b for b in sorted_blocks if b["bbox"][1] <= threshold]
+    n_header = int(np.searchsorted(sorted_bboxes[:, 1], threshold, side="right"))
     header_bbox = None
     header_lines = []
-    if header_items:
-        xs = [it["bbox"][0] for it in header_items] + [it["bbox"][2] for it in header_items]
-        ys = [it["bbox"][1] for it in header_items] + [it["bbox"][3] for it in header_items]
-        header_bbox = _round_bbox((min(xs), min(ys), max(xs), max(ys)))
-        header_lines = header_items
+    if n_header:
+        header_bbox = _round_bbox((float(x_lo[:n_header].min()), float(y_lo[:n_header].min()),
+                                   float(x_hi[:n_header].max()), float(y_hi[:n_header].max())), 2)
+        header_lines = sorted_blocks[:n_header]
 
     # detect sections by font size outliers or text that looks like headings
-    # compute median font size if available
-    sizes = [b.get("size") for b in blocks if b.get("size")]
-    median_size = None
-    if sizes:
-        sorted_sizes = sorted(sizes)
-        median_size = sorted_sizes[len(sorted_sizes) // 2]
-    sections = []
-    current_section = {"name": "General", "lines": [], "bbox": None}
-    for b in sorted_blocks:
+    # compute (upper) median font size if available; missing sizes count as 0
+    sizes = np.asarray([b.get("size") or 0.0 for b in sorted_blocks], dtype=np.float64)
+    known = sizes[sizes != 0]
+    if known.size:
+        # only the one order statistic is needed: introselect instead of a full sort
+        mid = known.size // 2
+        median_size = np.partition(known, mid)[mid]
+        size_heading = (sizes != 0) & (sizes >= median_size + 1.5)
+    else:
+        size_heading = np.zeros(len(sorted_blocks), dtype=bool)
+
+    # sections are contiguous runs of the sorted blocks, each starting at a heading
+    names = ["General"]
+    starts = [0]
+    for i, b in enumerate(sorted_blocks):
         text = b.get("text", "").strip()
-        is_heading = False
-        # heading heuristics:
-        if b.get("size") and median_size and b["size"] >= (median_size + 1.5):
-            is_heading = True
-        if text.endswith(":") or (len(text) < 40 and text.upper() == text and len(text.split()) <= 4):
-            is_heading = True
-        if is_heading:
-            # finalize previous
-            if current_section["lines"]:
-                # compute bbox of current
-                xs = [it["bbox"][0] for it in current_section["lines"]] + [it["bbox"][2] for it in current_section["lines"]]
-                ys = [it["bbox"][1] for it in current_section["lines"]] + [it["bbox"][3] for it in current_section["lines"]]
-                current_section["bbox"] = _round_bbox((min(xs), min(ys), max(xs), max(ys)))
-                sections.append(current_section)
-            # start new section
-            current_section = {"name": text.rstrip(":"), "lines": [b], "bbox": None}
-        else:
-            current_section["lines"].append(b)
-
-    # push final section
-    if current_section["lines"]:
-        xs = [it["bbox"][0] for it in current_section["lines"]] + [it["bbox"][2] for it in current_section["lines"]]
-        ys = [it["bbox"][1] for it in current_section["lines"]] + [it["bbox"][3] for it in current_section["lines"]]
-        current_section["bbox"] = _round_bbox((min(xs), min(ys), max(xs), max(ys)))
-        sections.append(current_section)
+        # heading heuristics: larger font, trailing colon, or short upper-case text
+        if size_heading[i] or text.endswith(":") or (len(text) < 40 and text.upper() == text and len(text.split()) <= 4):
+            if starts[-1] == i:
+                # previous section has no lines yet (only possible for "General" at 0)
+                names.pop()
+                starts.pop()
+            names.append(text.rstrip(":"))
+            starts.append(i)
+
+    # per-section bboxes in one reduction per edge
+    edges = zip(np.minimum.reduceat(x_lo, starts).tolist(), np.minimum.reduceat(y_lo, starts).tolist(),
+                np.maximum.reduceat(x_hi, starts).tolist(), np.maximum.reduceat(y_hi, starts).tolist())
+    ends = starts[1:] + [len(sorted_blocks)]
+    sections = [
+        {"name": name, "lines": sorted_blocks[start:end], "bbox": _round_bbox(bbox, 2)}
+        for name, start, end, bbox in zip(names, starts, ends, edges)
+    ]
 
     return {"header": {"bbox": header_bbox, "lines": header_lines}, "sections": sections}
 
@@ -250,8 +300,10 @@ def parse_template(pdf_path: str, page_number: int = 0) -> Dict[str, Any]:
     # Basic normalization: merge adjacent spans that belong to same line (optional)
     # For now keep blocks as-is.
 
-    zones = group_blocks_into_zones(blocks, page_h, num_zones=6)
-    detection = detect_head_and_sections(blocks, page_h)
+    # spans stay dicts (they're saved as JSON); their bboxes are packed once for both passes
+    bboxes = _bbox_array(blocks)
+    zones = group_blocks_into_zones(blocks, page_h, num_zones=6, bboxes=bboxes)
+    detection = detect_head_and_sections(blocks, page_h, bboxes=bboxes)
 
     template = {
         "source_pdf": os.path.abspath(pdf_path),
@@ -265,11 +317,18 @@ def parse_template(pdf_path: str, page_number: int = 0) -> Dict[str, Any]:
 
 
 def save_template(template: Dict[str, Any], out_path: str) -> None:
+    if orjson is not None:
+        with open(out_path, "wb") as f:
+            f.write(orjson.dumps(template, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+        return
     with open(out_path, "w", encoding="utf-8") as f:
         json.dump(template, f, indent=2)
 
 
 def load_template(json_path: str) -> Dict[str, Any]:
+    if orjson is not None:
+        with open(json_path, "rb") as f:
+            return orjson.loads(f.read())
     with open(json_path, "r", encoding="utf-8") as f:
         return json.load(f)
 
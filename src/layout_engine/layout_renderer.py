@@ -15,8 +15,12 @@ Key Features:
 """
 
 import os
+import re
+import copy
 import json
+from functools import lru_cache
 from io import BytesIO
+from typing import Dict, Tuple
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import ParagraphStyle
@@ -26,58 +30,65 @@ from reportlab.platypus import (
     Spacer,
     Table,
     TableStyle,
-    ListFlowable,
-    ListItem,
 )
+from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.pdfmetrics import stringWidth
 
+# orjson is optional; fall back to stdlib json when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Load the default faces' metrics at import so the first render doesn't pay for it
+# (Helvetica is a built-in Type 1 font; there is no TTF to register).
+for _face in ("Helvetica", "Helvetica-Bold"):
+    pdfmetrics.getFont(_face)
+
+# lowercased heading prefixes; str.startswith takes the whole tuple in one call
+_HEAD_KEYS = ("education", "experience", "projects", "skills", "profile")
+_BULLET_PREFIXES = ("•", "-")
+# the leading run of bullet markers/spaces ("• ", "- ", "• - "); hyphens inside the text stay
+_BULLET_LEAD_RE = re.compile(r"^[\u2022\-\s]+")
+
 
 def load_template(template_path: str) -> dict:
     """Load layout template JSON."""
     if not os.path.exists(template_path):
         raise FileNotFoundError(f"Template not found: {template_path}")
+    if orjson is not None:
+        with open(template_path, "rb") as f:
+            return orjson.loads(f.read())
     with open(template_path, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
+@lru_cache(maxsize=64)
+def _avg_char_width(font_name: str, font_size: float) -> float:
+    """Width of an "M" in the given font; font metrics don't change, so cache per (font, size)."""
+    return stringWidth("M", font_name, font_size)
+
+
 def estimate_text_height(text, style, width):
     """Estimate text height to handle adaptive scaling."""
-    avg_char_width = stringWidth("M", style.fontName, style.fontSize)
-    chars_per_line = width / avg_char_width
+    chars_per_line = width / _avg_char_width(style.fontName, style.fontSize)
     num_lines = max(1, len(text) / chars_per_line)
     return num_lines * style.leading
 
 
-def render_resume(enhanced_text: str, template_path="templates/sample_template.json") -> bytes:
-    """Render an enhanced resume using an adaptive one-page layout."""
-    template = load_template(template_path)
-    page_cfg = template.get("page", {})
-    page_size = A4
-    buffer = BytesIO()
-
-    # Margins and sizing
-    margins = page_cfg.get("margins", {"top": 50, "left": 50, "right": 50, "bottom": 50})
-    width, height = page_size
-    max_height = height - (margins["top"] + margins["bottom"])
-    max_width = width - (margins["left"] + margins["right"])
+@lru_cache(maxsize=32)
+def _hex_color(value: str):
+    return colors.HexColor(value)
 
-    # Setup document
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=page_size,
-        rightMargin=margins["right"],
-        leftMargin=margins["left"],
-        topMargin=margins["top"],
-        bottomMargin=margins["bottom"],
-    )
 
-    # Define styles
-    text_color = colors.HexColor(page_cfg.get("text_color", "#1A1A1A"))
-    header_color = colors.HexColor(page_cfg.get("header_color", "#0A66C2"))
+def _build_styles(page_cfg: dict) -> dict:
+    """Paragraph styles derived from a template's page config."""
+    text_color = _hex_color(page_cfg.get("text_color", "#1A1A1A"))
+    header_color = _hex_color(page_cfg.get("header_color", "#0A66C2"))
 
     base_font = page_cfg.get("font_family", "Helvetica")
     base_size = page_cfg.get("font_size", 11)
-    styles = {
+    return {
         "Header": ParagraphStyle(
             name="Header",
             fontName=f"{base_font}-Bold",
@@ -103,18 +114,88 @@ def render_resume(enhanced_text: str, template_path="templates/sample_template.j
             leading=base_size + 4,
             textColor=text_color,
         ),
+        # native bullet paragraph: far lighter to lay out than a one-item ListFlowable
+        "Bullet": ParagraphStyle(
+            name="Bullet",
+            fontName=base_font,
+            fontSize=base_size,
+            leading=base_size + 4,
+            textColor=text_color,
+            leftIndent=18,
+            bulletIndent=6,
+            bulletFontName=base_font,
+            bulletFontSize=base_size,
+        ),
     }
 
-    # Split text into sections by common keywords
-    text = enhanced_text.replace("\r", "")
+
+# (template_path, mtime) -> (page_cfg, styles); editing the template file invalidates its entry
+_TEMPLATE_CACHE: Dict[Tuple[str, float], Tuple[dict, dict]] = {}
+
+
+def _template_page_and_styles(template_path: str) -> Tuple[dict, dict]:
+    """
+    Parsed page config and styles for a template, cached across render_resume calls.
+    The styles are returned as copies since the adaptive fit resizes them in place.
+    """
+    try:
+        key = (template_path, os.path.getmtime(template_path))
+    except OSError:
+        raise FileNotFoundError(f"Template not found: {template_path}")
+    cached = _TEMPLATE_CACHE.get(key)
+    if cached is None:
+        page_cfg = load_template(template_path).get("page", {})
+        cached = (page_cfg, _build_styles(page_cfg))
+        # drop entries for older versions of the same file
+        for stale in [k for k in _TEMPLATE_CACHE if k[0] == template_path]:
+            del _TEMPLATE_CACHE[stale]
+        _TEMPLATE_CACHE[key] = cached
+    page_cfg, styles = cached
+    return page_cfg, {name: copy.copy(style) for name, style in styles.items()}
+
+
+def render_resume(enhanced_text: str, template_path="templates/sample_template.json") -> bytes:
+    """Render an enhanced resume using an adaptive one-page layout."""
+    page_cfg, styles = _template_page_and_styles(template_path)
+    page_size = A4
+    buffer = BytesIO()
+
+    # Margins and sizing
+    margins = page_cfg.get("margins", {"top": 50, "left": 50, "right": 50, "bottom": 50})
+    width, height = page_size
+    max_height = height - (margins["top"] + margins["bottom"])
+    max_width = width - (margins["left"] + margins["right"])
+
+    # Setup document
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=page_size,
+        rightMargin=margins["right"],
+        leftMargin=margins["left"],
+        topMargin=margins["top"],
+        bottomMargin=margins["bottom"],
+    )
+    base_size = page_cfg.get("font_size", 11)
+
+    # Split text into sections by common keywords, accumulating the line-count estimate
+    # for the adaptive fit in the same pass (splitlines already treats "\r" as a break)
+    normal = styles["Normal"]
+    chars_per_line = max_width / _avg_char_width(normal.fontName, normal.fontSize)
+    raw_lines = enhanced_text.splitlines()
+    # each line counts max(1, len/cpl) <= 1 + len/cpl, so this bounds the estimate from above;
+    # when even the bound fits the page, the per-line estimate is skipped
+    may_overflow = (len(raw_lines) + len(enhanced_text) / chars_per_line) * normal.leading > max_height
+    est_lines = 0
     sections = {}
     current_section = "Header"
     sections[current_section] = []
-    for line in text.splitlines():
+    for line in raw_lines:
+        if may_overflow:
+            est_lines += max(1, len(line) / chars_per_line)
         line = line.strip()
         if not line:
             continue
-        if any(line.lower().startswith(s.lower()) for s in ["education", "experience", "projects", "skills", "profile"]):
+        if line.lower().startswith(_HEAD_KEYS):
             current_section = line.title()
             sections[current_section] = []
         else:
@@ -126,27 +207,26 @@ def render_resume(enhanced_text: str, template_path="templates/sample_template.j
         if section_name != "Header":
             content.append(Paragraph(section_name, styles["SectionTitle"]))
         for line in lines:
-            if line.startswith("•") or line.startswith("-"):
-                bullet = line.replace("•", "").replace("-", "").strip()
-                content.append(ListFlowable([ListItem(Paragraph(bullet, styles["Normal"]))], bulletType="bullet"))
+            if line.startswith(_BULLET_PREFIXES):
+                bullet = _BULLET_LEAD_RE.sub("", line, count=1)
+                content.append(Paragraph(bullet, styles["Bullet"], bulletText="•"))
             else:
                 content.append(Paragraph(line, styles["Normal"]))
         content.append(Spacer(1, 6))
 
     # Adaptive fit: shrink font if text is too long
-    total_est_height = sum(estimate_text_height(l, styles["Normal"], max_width) for l in enhanced_text.splitlines())
-    if total_est_height > max_height:
+    total_est_height = est_lines * normal.leading
+    if may_overflow and total_est_height > max_height:
         scale_factor = max_height / total_est_height
         scaled_font = max(8, base_size * scale_factor * 1.1)
         for style in styles.values():
             style.fontSize = scaled_font
+            style.bulletFontSize = scaled_font
             style.leading = scaled_font + 3
 
     # Build document
     doc.build(content)
-    pdf_data = buffer.getvalue()
-    buffer.close()
-    return pdf_data
+    return buffer.getvalue()
 
 
 if __name__ == "__main__":
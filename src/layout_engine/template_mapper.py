@@ -5,13 +5,34 @@ based on a JSON template (e.g., templates/sample_template.json).
 """
 
 import json
-from typing import Dict, Any
+import re
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
+
+# orjson is optional; fall back to stdlib json when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+@lru_cache(maxsize=16)
+def _title_pattern(titles: Tuple[str, ...]) -> Optional["re.Pattern[str]"]:
+    """One alternation over the lowercased section titles, searched against a lowercased line."""
+    if not titles:
+        return None
+    return re.compile("|".join(map(re.escape, titles)))
+
 
 def load_template(template_path: str) -> Dict[str, Any]:
     """Load JSON layout template."""
+    if orjson is not None:
+        with open(template_path, "rb") as f:
+            return orjson.loads(f.read())
     with open(template_path, "r", encoding="utf-8") as f:
         return json.load(f)
 
+
 def map_text_to_template(enhanced_text: str, template: Dict[str, Any]) -> Dict[str, Any]:
     """
     Simple placeholder mapper: splits enhanced text into sections matching the template.
@@ -20,13 +41,15 @@ def map_text_to_template(enhanced_text: str, template: Dict[str, Any]) -> Dict[s
     sections = {}
     current_section = "Body"
     sections[current_section] = []
+    # titles lowered once per call instead of once per line
+    title_re = _title_pattern(tuple(sec["title"].lower() for sec in template.get("sections", []) if "title" in sec))
 
     for line in enhanced_text.splitlines():
         line = line.strip()
         if not line:
             continue
         # Detect section headers (rough heuristic)
-        if any(sec["title"].lower() in line.lower() for sec in template.get("sections", [])):
+        if title_re is not None and title_re.search(line.lower()):
             current_section = line
             sections[current_section] = []
         else:
@@ -7,7 +7,7 @@ Features:
     * file path string (e.g. "samples/sample_resume.pdf")
     * file-like object with .read() and .name (Streamlit UploadedFile)
     * raw bytes
-- Supports PDF (pdfplumber) and DOCX (python-docx)
+- Supports PDF (PyMuPDF, falling back to pdfplumber) and DOCX (python-docx)
 - Exposes:
     * parse_resume(source) -> str (plain text)
     * parse_and_extract(source) -> dict { "text", "sections", "skills" }
@@ -19,49 +19,82 @@ import os
 import pdfplumber
 import docx
 
+# PyMuPDF's C parser is much faster than pdfplumber (pure-Python pdfminer.six);
+# pdfplumber stays as the fallback when it isn't installed.
+try:
+    import fitz  # PyMuPDF
+    _HAS_FITZ = True
+except Exception:
+    _HAS_FITZ = False
+
 # local extractor (expects src/extractor.py to exist)
-from .extractor import extract_sections, extract_skills
+from .extractor import extract_sections, extract_skills, HEADING_LINE_RE
 
+# DOCX files are zip containers; python-docx can't open anything without this signature
+_ZIP_MAGIC = b"PK\x03\x04"
 
-def _read_pdf_bytes(data: bytes) -> str:
-    text_parts = []
-    with pdfplumber.open(io.BytesIO(data)) as pdf:
+
+def _read_pdf(src: Union[str, "io.IOBase"]) -> str:
+    if _HAS_FITZ:
+        return _read_pdf_fitz(src)
+    # pdfplumber accepts a path or any seekable binary stream
+    buf = io.StringIO()
+    with pdfplumber.open(src) as pdf:
         for page in pdf.pages:
             page_text = page.extract_text()
+            if page_text:
+                if buf.tell():
+                    buf.write("\n")
+                buf.write(page_text)
+            # release pdfminer's per-page layout objects and the cached textmap
+            page.close()
+    return buf.getvalue()
+
+
+def _read_pdf_fitz(src: Union[str, "io.IOBase"]) -> str:
+    if isinstance(src, str):
+        doc = fitz.open(src)
+    else:
+        # MuPDF only opens in-memory documents, so a stream is read in full here
+        doc = fitz.open(stream=src.read(), filetype="pdf")
+    text_parts = []
+    with doc:
+        for page in doc:
+            # MuPDF pads line ends with a space; trim so lines match pdfplumber's output
+            page_text = "\n".join(line.rstrip() for line in page.get_text("text").splitlines()).strip("\n")
             if page_text:
                 text_parts.append(page_text)
     return "\n".join(text_parts)
 
 
-def _read_docx_bytes(data: bytes) -> str:
-    # python-docx can read a file-like object via Document(io.BytesIO(...))
-    doc = docx.Document(io.BytesIO(data))
+def _read_docx(src: Union[str, "io.IOBase"]) -> str:
+    doc = docx.Document(src)
     paragraphs = [p.text for p in doc.paragraphs if p.text and p.text.strip()]
     return "\n".join(paragraphs)
 
 
+def _read_pdf_bytes(data: bytes) -> str:
+    return _read_pdf(io.BytesIO(data))
+
+
+def _read_docx_bytes(data: bytes) -> str:
+    # python-docx can read a file-like object via Document(io.BytesIO(...))
+    return _read_docx(io.BytesIO(data))
+
+
 def _read_pdf_path(path: str) -> str:
-    text_parts = []
-    with pdfplumber.open(path) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text_parts.append(page_text)
-    return "\n".join(text_parts)
+    return _read_pdf(path)
 
 
 def _read_docx_path(path: str) -> str:
-    doc = docx.Document(path)
-    paragraphs = [p.text for p in doc.paragraphs if p.text and p.text.strip()]
-    return "\n".join(paragraphs)
+    return _read_docx(path)
 
 
-def _is_streamlit_uploaded_file(obj: Any) -> bool:
-    """
-    Heuristic: Streamlit's UploadedFile has .read() and .name attributes.
-    We simply check for both.
-    """
-    return hasattr(obj, "read") and hasattr(obj, "name")
+def _is_seekable_stream(obj: Any) -> bool:
+    try:
+        return bool(obj.seekable())
+    except Exception:
+        return False
 
 
 def parse_resume(source: Union[str, bytes, "io.IOBase"]) -> str:
@@ -96,13 +129,16 @@ def parse_resume(source: Union[str, bytes, "io.IOBase"]) -> str:
         try:
             if header.startswith(b"%PDF"):
                 return _read_pdf_bytes(data)
-            else:
+            elif header.startswith(_ZIP_MAGIC):
                 # attempt DOCX
                 try:
                     return _read_docx_bytes(data)
                 except Exception:
                     # fallback to PDF parse attempt
                     return _read_pdf_bytes(data)
+            else:
+                # not a zip, so not a DOCX: only a PDF parse attempt is left
+                return _read_pdf_bytes(data)
         except Exception:
             # as ultimate fallback decode utf-8
             try:
@@ -111,7 +147,27 @@ def parse_resume(source: Union[str, bytes, "io.IOBase"]) -> str:
                 return ""
 
     # 3) If file-like object (Streamlit UploadedFile or io.BytesIO, etc.)
-    if hasattr(source, "read"):
+    # isinstance covers the io classes (UploadedFile is a BytesIO); hasattr catches duck-typed readers
+    if isinstance(source, io.IOBase) or hasattr(source, "read"):
+        # Seekable binary streams with a known extension go straight to the readers,
+        # so pdfplumber and python-docx read them in place instead of from a copied
+        # buffer (PyMuPDF still needs the bytes in memory, see _read_pdf_fitz).
+        # Anything that fails here is retried through the buffered path below.
+        name = (getattr(source, "name", "") or "").lower()
+        if _is_seekable_stream(source) and not isinstance(source, io.TextIOBase):
+            try:
+                source.seek(0)
+                if name.endswith(".pdf"):
+                    return _read_pdf(source)
+                if name.endswith(".docx") or name.endswith(".doc"):
+                    return _read_docx(source)
+            except Exception:
+                pass
+            try:
+                source.seek(0)
+            except Exception:
+                pass
+
         # Some file-like objects (Streamlit) give bytes when .read() is called.
         # Save current position if possible
         try:
@@ -147,8 +203,10 @@ def parse_resume(source: Union[str, bytes, "io.IOBase"]) -> str:
         if header.startswith(b"%PDF"):
             return _read_pdf_bytes(data)
         else:
-            # attempt docx first, then pdf
+            # attempt docx first (only zip data can be one), then pdf
             try:
+                if not header.startswith(_ZIP_MAGIC):
+                    raise ValueError("not a zip container")
                 return _read_docx_bytes(data)
             except Exception:
                 try:
@@ -179,7 +237,10 @@ def parse_and_extract(source: Union[str, bytes, "io.IOBase"]) -> Dict[str, Union
     text = parse_resume(source)
     # extractor functions expect plain text
     sections = extract_sections(text) or {}
-    skills = extract_skills(sections) or []
+    # name/contact block above the first heading (or the top of the text)
+    m = HEADING_LINE_RE.search(text)
+    resume_top = text[:m.start()] if m else text[:2000]
+    skills = extract_skills(sections, resume_top) or []
     return {"text": text, "sections": sections, "skills": skills}
 
 
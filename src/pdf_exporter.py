@@ -6,24 +6,63 @@ Adaptive Resume PDF Exporter (v4.0)
 - Accepts either structured layout dict OR plain enhanced text
 - Uses PDFShift API (if configured) for crisp HTML rendering
 - Falls back to ReportLab adaptive rendering if PDFShift unavailable
+- Optional: set PDF_TEMPLATE_CACHE_DIR to keep compiled Jinja bytecode between runs
+- Optional: set PDF_USE_WEASYPRINT=1 (with `pip install weasyprint`) to render locally
+  from the same HTML template via WeasyPrint instead of ReportLab
 """
 
 import os
 import re
 import json
+import functools
+import hashlib
+import tempfile
+import threading
 import requests
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from io import BytesIO
+from urllib3.util.retry import Retry
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, HRFlowable
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
-from jinja2 import Template
+from jinja2 import DictLoader, Environment, FileSystemBytecodeCache
+from markupsafe import escape
+
+# orjson is optional; fall back to stdlib json when it isn't installed
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+
+# WeasyPrint is an opt-in extra: ReportLab stays the local renderer unless
+# PDF_USE_WEASYPRINT is 1, true or yes (it also needs the pango/cairo system libraries).
+USE_WEASYPRINT = os.getenv("PDF_USE_WEASYPRINT", "").strip().lower() in ("1", "true", "yes")
+_WeasyHTML = None
+_WEASY_IMPORT_ERROR = None
+if USE_WEASYPRINT:
+    try:
+        from weasyprint import HTML as _WeasyHTML
+    except (ImportError, OSError) as e:
+        _WEASY_IMPORT_ERROR = e
 
 PDFSHIFT_ENDPOINT = "https://api.pdfshift.io/v3/convert/pdf"
 
+# One pooled keep-alive session so repeated exports reuse the TCP/TLS connection.
+# Gateway errors get two quick retries (POST included); the last response is returned as-is.
+_SESSION = requests.Session()
+_SESSION.mount("https://", requests.adapters.HTTPAdapter(
+    pool_connections=4, pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504),
+                      allowed_methods=frozenset({"POST"}), raise_on_status=False),
+))
+
 # -------------------------------
-# HTML TEMPLATE (for PDFShift)
+# HTML TEMPLATE (for PDFShift / WeasyPrint)
 # -------------------------------
 HTML_TEMPLATE = """
 <!doctype html>
@@ -49,13 +88,13 @@ HTML_TEMPLATE = """
   {% endif %}
 
   {% for sec in sections %}
-    <h2>{{ sec.title }}</h2>
+    {% if sec.title %}<h2>{{ sec.title }}</h2>{% endif %}
     <div>
-      {% for line in sec.content.splitlines() %}
-        {% if line.startswith("•") or line.startswith("-") %}
-          <ul><li>{{ line[1:].strip() }}</li></ul>
+      {% for is_bullet, text in sec.lines %}
+        {% if is_bullet %}
+          <ul><li>{{ text }}</li></ul>
         {% else %}
-          <p>{{ line.strip() }}</p>
+          <p>{{ text }}</p>
         {% endif %}
       {% endfor %}
     </div>
@@ -66,17 +105,56 @@ HTML_TEMPLATE = """
 </html>
 """
 
+# Compiled once at import and reused for every render. auto_reload is off since the
+# source is a string constant; autoescape keeps "&" / "<" in resume text from breaking the HTML.
+# Loading by name (rather than from_string) lets a bytecode cache skip the compile step on
+# later process starts; it is only used when PDF_TEMPLATE_CACHE_DIR names a directory, so
+# importing the module never touches the filesystem by default.
+_BYTECODE_CACHE = None
+if os.getenv("PDF_TEMPLATE_CACHE_DIR"):
+    try:
+        os.makedirs(os.environ["PDF_TEMPLATE_CACHE_DIR"], exist_ok=True)
+        _BYTECODE_CACHE = FileSystemBytecodeCache(os.environ["PDF_TEMPLATE_CACHE_DIR"])
+    except OSError:
+        _BYTECODE_CACHE = None
+_ENV = Environment(
+    loader=DictLoader({"resume.html": HTML_TEMPLATE}),
+    autoescape=True,
+    auto_reload=False,
+    optimized=True,
+    cache_size=50,
+    bytecode_cache=_BYTECODE_CACHE,
+)
+_TEMPLATE = _ENV.get_template("resume.html")
+
+# line prefixes rendered as bullets; str.startswith takes the tuple in one call
+_BULLET_CHARS = ("•", "-")
+
 # -------------------------------
 # Text Utilities
 # -------------------------------
+_RE_BOLD = re.compile(r"\*\*(.*?)\*\*")
+_RE_ITAL = re.compile(r"\*(.*?)\*")
+_RE_HDR = re.compile(r"^#{1,6}\s*", re.MULTILINE)
+_RE_LINK = re.compile(r"\[([^\]]+)\]\([^\)]+\)")
+_RE_MULTI_NL = re.compile(r"\n{3,}")
+
+
 def _clean_text(text: str) -> str:
     """Clean Markdown, bullets, and excessive spacing."""
-    text = re.sub(r"\*\*(.*?)\*\*", r"\1", text)
-    text = re.sub(r"\*(.*?)\*", r"\1", text)
-    text = re.sub(r"^#{1,6}\s*", "", text, flags=re.MULTILINE)
-    text = re.sub(r"\[([^\]]+)\]\([^\)]+\)", r"\1", text)
-    text = re.sub(r"\r\n", "\n", text)
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    # bold before italic: "***x***" relies on the bold pass leaving "*x*" for the italic one.
+    # The passes feed each other, so they stay separate; a substring probe skips the ones
+    # that cannot match (plain prose usually has no markdown at all).
+    if "*" in text:
+        text = _RE_BOLD.sub(r"\1", text)
+        text = _RE_ITAL.sub(r"\1", text)
+    if "#" in text:
+        text = _RE_HDR.sub("", text)
+    if "](" in text:
+        text = _RE_LINK.sub(r"\1", text)
+    text = text.replace("\r\n", "\n")
+    if "\n\n\n" in text:
+        text = _RE_MULTI_NL.sub("\n\n", text)
     return text.strip()
 
 def _extract_header(text: str):
@@ -89,10 +167,8 @@ def _extract_header(text: str):
 # -------------------------------
 # ReportLab Renderer (Adaptive)
 # -------------------------------
-def _render_reportlab(layout: dict | str) -> bytes:
-    """Render resume to 1-page PDF using ReportLab."""
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, leftMargin=50, rightMargin=50, topMargin=50, bottomMargin=45)
+def _build_styles():
+    """Sample stylesheet plus the exporter styles; built once at import."""
     styles = getSampleStyleSheet()
 
     styles.add(ParagraphStyle(name="Header", fontName="Helvetica-Bold", fontSize=18,
@@ -103,102 +179,312 @@ def _render_reportlab(layout: dict | str) -> bytes:
                               leading=16, textColor=colors.HexColor("#0A66C2"), spaceBefore=8, spaceAfter=4))
     styles.add(ParagraphStyle(name="Body", fontName="Helvetica", fontSize=10,
                               leading=13, alignment=TA_LEFT, textColor=colors.black))
+    return styles
+
+
+# styles are read-only during doc.build, so one stylesheet is shared by every export
+_STYLES = _build_styles()
+
+
+def _render_reportlab_into(layout: dict | str, sink) -> None:
+    """Render resume to 1-page PDF using ReportLab, writing it straight into `sink`."""
+    doc = SimpleDocTemplate(sink, pagesize=A4, leftMargin=50, rightMargin=50, topMargin=50, bottomMargin=45)
+    styles = _STYLES
 
     elements = []
+    # style refs and the append bound once, outside the per-line loops
+    add = elements.append
+    body, section_title = styles["Body"], styles["SectionTitle"]
 
     # Structured layout (dict)
     if isinstance(layout, dict):
         name = layout.get("name", "")
         contact = layout.get("contact", "")
         if name:
-            elements.append(Paragraph(name, styles["Header"]))
+            add(Paragraph(name, styles["Header"]))
             if contact:
-                elements.append(Paragraph(contact, styles["Contact"]))
-            elements.append(HRFlowable(width="100%", thickness=0.6, color=colors.grey))
-            elements.append(Spacer(1, 6))
+                add(Paragraph(contact, styles["Contact"]))
+            add(HRFlowable(width="100%", thickness=0.6, color=colors.grey))
+            add(Spacer(1, 6))
 
         for sec in layout.get("sections", []):
             title = sec.get("title", "").strip()
             content = sec.get("content", "").strip()
             if title:
-                elements.append(Paragraph(title, styles["SectionTitle"]))
+                add(Paragraph(title, section_title))
             for line in content.splitlines():
                 if not line.strip():
                     continue
-                if line.startswith("•") or line.startswith("-"):
+                if line.startswith(_BULLET_CHARS):
                     line = f"• {line.lstrip('•-').strip()}"
-                elements.append(Paragraph(line, styles["Body"]))
-            elements.append(Spacer(1, 6))
+                add(Paragraph(line, body))
+            add(Spacer(1, 6))
 
     # Plain text fallback
     else:
         clean = _clean_text(layout)
         name, contact = _extract_header(clean)
         if name:
-            elements.append(Paragraph(name, styles["Header"]))
+            add(Paragraph(name, styles["Header"]))
             if contact:
-                elements.append(Paragraph(contact, styles["Contact"]))
-            elements.append(Spacer(1, 8))
+                add(Paragraph(contact, styles["Contact"]))
+            add(Spacer(1, 8))
         for line in clean.splitlines():
             if line.strip():
-                elements.append(Paragraph(line, styles["Body"]))
+                add(Paragraph(line, body))
 
     # Footer
-    elements.append(Spacer(1, 10))
-    elements.append(Paragraph("<i>Enhanced by AI Resume Enhancer © 2025</i>", styles["Contact"]))
+    add(Spacer(1, 10))
+    add(Paragraph("<i>Enhanced by AI Resume Enhancer © 2025</i>", styles["Contact"]))
     doc.build(elements)
-    return buffer.getvalue()
 
 # -------------------------------
 # PDFShift Renderer (Preferred)
 # -------------------------------
-def _render_pdfshift(layout_dict: dict, api_key: str) -> bytes:
-    tmpl = Template(HTML_TEMPLATE)
-    html = tmpl.render(
+PDFSHIFT_CHUNK_SIZE = 64 * 1024
+
+
+@functools.lru_cache(maxsize=256)
+def _html_lines(content: str) -> tuple:
+    """(is_bullet, escaped text) per line; escaped once here so autoescape passes the Markup through.
+    Memoized per section body, so re-rendering after editing one section only re-splits that one."""
+    return tuple(
+        (True, escape(line[1:].strip())) if line.startswith(_BULLET_CHARS) else (False, escape(line.strip()))
+        for line in content.splitlines()
+    )
+
+
+def _render_html(layout_dict: dict) -> str:
+    sections = [
+        {"title": sec.get("title", ""), "lines": _html_lines(sec.get("content") or "")}
+        for sec in layout_dict.get("sections", [])
+    ]
+    return _TEMPLATE.render(
         name=layout_dict.get("name", ""),
         contact=layout_dict.get("contact", ""),
-        sections=layout_dict.get("sections", [])
+        sections=sections
     )
-    resp = requests.post(
+
+
+def _iter_pdfshift(layout_dict: dict, api_key: str):
+    """Yield the converted PDF in chunks as it arrives, without buffering the whole body."""
+    html = _render_html(layout_dict)
+    with _SESSION.post(
         PDFSHIFT_ENDPOINT,
         auth=(api_key, ""),
         json={"source": html, "landscape": False},
-        timeout=60
-    )
-    if resp.status_code != 200:
-        raise RuntimeError(f"PDFShift failed: {resp.status_code} {resp.text}")
-    return resp.content
+        timeout=60,
+        stream=True,
+    ) as resp:
+        if resp.status_code != 200:
+            raise RuntimeError(f"PDFShift failed: {resp.status_code} {resp.text}")
+        yield from resp.iter_content(chunk_size=PDFSHIFT_CHUNK_SIZE)
+
+
+def _render_pdfshift(layout_dict: dict, api_key: str) -> bytes:
+    return b"".join(_iter_pdfshift(layout_dict, api_key))
+
+# -------------------------------
+# Local Renderer (ReportLab; WeasyPrint when PDF_USE_WEASYPRINT is set)
+# -------------------------------
+def _text_layout(text: str) -> dict:
+    """Plain enhanced text in the layout-dict shape (header + one untitled section),
+    mirroring the ReportLab plain-text path, so both shapes share the one HTML template."""
+    clean = _clean_text(text)
+    name, contact = _extract_header(clean)
+    return {"name": name, "contact": contact, "sections": [{"title": "", "content": clean}]}
+
+
+def _render_local_into(layout: dict | str, sink) -> None:
+    """Render offline into `sink` with ReportLab, or, when PDF_USE_WEASYPRINT is set, from
+    the same HTML template as PDFShift via WeasyPrint (both input shapes)."""
+    if not USE_WEASYPRINT:
+        _render_reportlab_into(layout, sink)
+        return
+    if _WeasyHTML is None:
+        raise RuntimeError(f"❌ PDF_USE_WEASYPRINT is enabled but WeasyPrint could not be loaded: {_WEASY_IMPORT_ERROR}")
+    layout_dict = layout if isinstance(layout, dict) else _text_layout(layout)
+    try:
+        pdf = _WeasyHTML(string=_render_html(layout_dict)).write_pdf()
+    except Exception as e:
+        raise RuntimeError(f"❌ WeasyPrint render failed: {e}") from e
+    sink.write(pdf)
+
+
+def _render_local(layout: dict | str) -> bytes:
+    buffer = BytesIO()
+    _render_local_into(layout, buffer)
+    return buffer.getvalue()
 
 # -------------------------------
 # Public API
 # -------------------------------
+@functools.lru_cache(maxsize=1)
+def _pdfshift_api_key():
+    # resolved once per process: importing streamlit and reading st.secrets is slow
+    try:
+        import streamlit as st
+        return st.secrets.get("PDFSHIFT_API_KEY") or os.getenv("PDFSHIFT_API_KEY")
+    except Exception:
+        return os.getenv("PDFSHIFT_API_KEY")
+
+
+def _coerce_input(enhanced_input):
+    # Try to parse JSON string if passed as text; plain résumé text never starts
+    # with a bracket, so peek first instead of paying for a failed parse.
+    # Bytes go to the parser as-is (orjson reads them without a decode copy).
+    if isinstance(enhanced_input, (bytes, bytearray)):
+        if enhanced_input.lstrip()[:1] in (b"{", b"["):
+            try:
+                return _json_loads(enhanced_input)
+            except ValueError:
+                pass
+        return enhanced_input.decode("utf-8")
+    if isinstance(enhanced_input, str) and enhanced_input.lstrip()[:1] in ("{", "["):
+        try:
+            return _json_loads(enhanced_input)
+        except ValueError:
+            pass
+    return enhanced_input
+
+
+def _render_with_fallback(enhanced_input, api_key):
+    """Returns (pdf_bytes, degraded); degraded is True when PDFShift failed and ReportLab stood in."""
+    # Case 1: PDFShift (best visual)
+    if isinstance(enhanced_input, dict) and api_key:
+        try:
+            return _render_pdfshift(enhanced_input, api_key), False
+        except Exception as e:
+            print("⚠️ PDFShift failed, falling back:", e)
+            # Case 2: Fallback to local render
+            return _render_local(enhanced_input), True
+
+    # Case 2: Fallback to local render
+    return _render_local(enhanced_input), False
+
+
+def _generate_one(enhanced_input, api_key) -> bytes:
+    return _render_with_fallback(_coerce_input(enhanced_input), api_key)[0]
+
+
+# Rendered PDFs keyed by a hash of the normalized input (and which renderer applies),
+# so re-exporting an unchanged resume skips the render/network call. LRU, bounded.
+PDF_CACHE_SIZE = 64
+_PDF_CACHE: "OrderedDict[str, bytes]" = OrderedDict()
+_PDF_CACHE_LOCK = threading.Lock()
+
+
+def _pdf_cache_key(enhanced_input, api_key) -> str:
+    payload = json.dumps(enhanced_input, sort_keys=True, default=str)
+    if isinstance(enhanced_input, dict) and api_key:
+        renderer = "pdfshift"
+    elif USE_WEASYPRINT:
+        renderer = "weasyprint"
+    else:
+        renderer = "reportlab"
+    return hashlib.blake2b(f"{renderer}\0{payload}".encode("utf-8"), digest_size=16).hexdigest()
+
+
 def generate_resume_pdf(enhanced_input, parsed_sections: dict = None) -> bytes:
     """
     Accepts:
      - enhanced_input (dict from mapper or raw text)
      - parsed_sections (optional)
     Uses PDFShift if key found, else ReportLab fallback.
+    Results are cached per input; a fallback after a PDFShift failure is not cached.
     """
-    # Try to parse JSON string if passed as text
-    if isinstance(enhanced_input, str):
-        try:
-            enhanced_input = json.loads(enhanced_input)
-        except Exception:
-            pass
+    enhanced_input = _coerce_input(enhanced_input)
+    api_key = _pdfshift_api_key()
+    key = _pdf_cache_key(enhanced_input, api_key)
+    with _PDF_CACHE_LOCK:
+        pdf = _PDF_CACHE.get(key)
+        if pdf is not None:
+            _PDF_CACHE.move_to_end(key)
+            return pdf
 
-    api_key = None
-    try:
-        import streamlit as st
-        api_key = st.secrets.get("PDFSHIFT_API_KEY") or os.getenv("PDFSHIFT_API_KEY")
-    except Exception:
-        api_key = os.getenv("PDFSHIFT_API_KEY")
+    pdf, degraded = _render_with_fallback(enhanced_input, api_key)
+    if not degraded:
+        with _PDF_CACHE_LOCK:
+            _PDF_CACHE[key] = pdf
+            _PDF_CACHE.move_to_end(key)
+            while len(_PDF_CACHE) > PDF_CACHE_SIZE:
+                _PDF_CACHE.popitem(last=False)
+    return pdf
 
-    # Case 1: PDFShift (best visual)
+
+# Background exports; the pool is created on the first submit, so importing the module
+# (or never using the async API) costs no executor.
+_PDF_EXECUTOR = None
+_PDF_EXECUTOR_LOCK = threading.Lock()
+
+
+def _pdf_executor() -> ThreadPoolExecutor:
+    global _PDF_EXECUTOR
+    with _PDF_EXECUTOR_LOCK:
+        if _PDF_EXECUTOR is None:
+            _PDF_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="pdf-export")
+        return _PDF_EXECUTOR
+
+
+def generate_resume_pdf_async(enhanced_input, parsed_sections: dict = None) -> Future:
+    """
+    Submit generate_resume_pdf to a background thread and return its Future, so the
+    caller can keep working and collect the bytes later (fut.done() / fut.result()).
+    """
+    return _pdf_executor().submit(generate_resume_pdf, enhanced_input, parsed_sections)
+
+
+def stream_resume_pdf(enhanced_input, sink, parsed_sections: dict = None) -> None:
+    """
+    Like generate_resume_pdf, but writes the PDF into `sink` (anything with .write(bytes))
+    chunk by chunk as PDFShift sends it, instead of holding the whole body in memory.
+    The local renderers write into `sink` directly as well.
+    Falls back to local rendering only if PDFShift fails before any bytes were written.
+    """
+    enhanced_input = _coerce_input(enhanced_input)
+    api_key = _pdfshift_api_key()
     if isinstance(enhanced_input, dict) and api_key:
+        written = 0
         try:
-            return _render_pdfshift(enhanced_input, api_key)
+            for chunk in _iter_pdfshift(enhanced_input, api_key):
+                sink.write(chunk)
+                written += len(chunk)
+            return
         except Exception as e:
+            if written:
+                # the sink already holds part of the PDFShift document; don't append another
+                raise
             print("⚠️ PDFShift failed, falling back:", e)
+    _render_local_into(enhanced_input, sink)
 
-    # Case 2: Fallback to local render
-    return _render_reportlab(enhanced_input)
+
+SPOOL_MAX_SIZE = 4 * 1024 * 1024
+
+
+def spool_resume_pdf(enhanced_input, parsed_sections: dict = None, max_size: int = SPOOL_MAX_SIZE):
+    """
+    stream_resume_pdf into a SpooledTemporaryFile and return it rewound: PDFs up to
+    `max_size` bytes stay in memory, larger ones spill to disk. Meant for callers that
+    hand a file object on (e.g. an HTTP response); the caller closes it.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=max_size)
+    try:
+        stream_resume_pdf(enhanced_input, spool, parsed_sections)
+    except Exception:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+def generate_resume_pdfs_batch(inputs: list, api_key: str = None, max_workers: int = 8) -> list:
+    """
+    generate_resume_pdf for many resumes at once; returns PDF bytes in input order.
+    PDFShift converts one document per request, so the requests are fanned out over the
+    pooled session (at most `max_workers` in flight) instead of sent one after another.
+    """
+    if not inputs:
+        return []
+    api_key = api_key or _pdfshift_api_key()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(inputs))) as pool:
+        return list(pool.map(lambda item: _generate_one(item, api_key), inputs))
@@ -1,4 +1,5 @@
 # tests/run_ats_test.py
+import sys
 from src import parser, ats_score
 
 # parse the sample resume
@@ -11,5 +12,4 @@ analytics, Excel, and coordination with vendors. Skills required: supply chain,
 """
 
 score, details = ats_score.score_resume(resume_text, jd)
-print("Estimated ATS score:", score)
-print("Details:", details)
+sys.stdout.write(f"Estimated ATS score: {score}\nDetails: {details}\n")
@@ -0,0 +1,17 @@
+# tests/run_extractor_test.py
+import sys
+from src.extractor import extract_skills
+
+# tokens from the resume's header region (name, city, email) are dropped from the skills
+top = "Jane Doe\nKarachi, Pakistan\njane.doe@example.com"
+skills = extract_skills({"Skills": "Python, SQL, Karachi, Excel"}, top)
+assert skills == ["Python", "SQL", "Excel"], skills
+
+# skills that only appear below the header region are kept
+skills = extract_skills({"Skills": "Doe Analytics, Python"}, "Jane Smith\nLahore")
+assert "Doe Analytics" in skills and "Python" in skills, skills
+
+# no skill text means no skills, whatever the header
+assert extract_skills({"Skills": "  \n"}, top) == []
+
+sys.stdout.write("Extractor tests passed\n")
@@ -1,29 +1,36 @@
 # tests/run_parser_test.py
+import sys
 from src import parser
 
+# "\n" -> literal "\\n" for one-line previews
+_NL_TABLE = str.maketrans({"\n": "\\n"})
+
 def main():
     path = "samples/sample_resume.pdf"  # change path if you placed PDF elsewhere
-    print("Using path:", path)
+    out = ["Using path: " + path]
     try:
         r = parser.parse_and_extract(path)
     except Exception as e:
-        print("Parser error:", e)
+        out.append(f"Parser error: {e}")
+        sys.stdout.write("\n".join(out) + "\n")
         return
 
-    print("---- TEXT PREVIEW (first 500 chars) ----")
+    out.append("---- TEXT PREVIEW (first 500 chars) ----")
     txt = r.get("text", "")
-    print(txt[:500].replace("\n", "\\n"))
-    print("\n---- SECTIONS ----")
+    out.append(txt[:500].translate(_NL_TABLE))
+    out.append("\n---- SECTIONS ----")
     sections = r.get("sections", {})
     if not sections:
-        print("No sections detected")
+        out.append("No sections detected")
     else:
         for k, v in sections.items():
-            print("SECTION:", k)
-            print(v[:200].replace("\n", "\\n"))
-            print("---")
-    print("\n---- SKILLS ----")
-    print(r.get("skills", []))
+            out.append(f"SECTION: {k}")
+            out.append(v[:200].translate(_NL_TABLE))
+            out.append("---")
+    out.append("\n---- SKILLS ----")
+    out.append(str(r.get("skills", [])))
+    # one write instead of a print (lock + flush) per line
+    sys.stdout.write("\n".join(out) + "\n")
 
 if __name__ == '__main__':
     main()
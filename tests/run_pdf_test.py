@@ -0,0 +1,84 @@
+# tests/run_pdf_test.py
+import asyncio
+import gzip
+import io
+import os
+import sys
+
+# keep the exporter on the local ReportLab renderer
+os.environ.pop("PDFSHIFT_API_KEY", None)
+
+from src import parser, pdf_exporter, pdf_utils
+from src.layout_engine.layout_renderer import render_resume
+
+TITLE = "Jane Doe"
+SECTIONS = {"Summary": "Analyst with five years of experience.", "Experience": "- Built reports\n- Led audits"}
+SKILLS = ["Excel", "SQL"]
+RESUME_TEXT = "Jane Doe\n\nSUMMARY\nAnalyst with five years of experience.\n\nSKILLS\nExcel, SQL"
+
+
+def is_pdf(data: bytes) -> bool:
+    return data[:4] == b"%PDF" and data.rstrip().endswith(b"%%EOF")
+
+
+def pdf_text(data: bytes) -> str:
+    return parser.parse_resume(data)
+
+
+# background / async / bulk builds
+fut = pdf_exporter.generate_resume_pdf_async(RESUME_TEXT)
+assert is_pdf(fut.result(timeout=60)), "generate_resume_pdf_async did not return a PDF"
+
+data = asyncio.run(pdf_utils.make_pdf_bytes_async(TITLE, SECTIONS, SKILLS))
+assert is_pdf(data), "make_pdf_bytes_async did not return a PDF"
+
+jobs = [dict(title=TITLE, sections=SECTIONS, skills=SKILLS), dict(title="John Roe", sections=SECTIONS, skills=[])]
+bulk = pdf_utils.make_pdfs_bulk(jobs, max_workers=2)
+assert len(bulk) == 2 and all(is_pdf(b) for b in bulk), "make_pdfs_bulk did not return one PDF per job"
+
+# gzip streaming: gunzips back to the same document make_pdf_to_stream writes
+gz_out = io.BytesIO()
+pdf_utils.make_pdf_to_gzip_stream(gz_out, TITLE, SECTIONS, SKILLS)
+data = gzip.decompress(gz_out.getvalue())
+assert is_pdf(data), "make_pdf_to_gzip_stream did not gunzip to a PDF"
+assert TITLE in pdf_text(data), "gzip-streamed PDF lost the title"
+
+# compiled layout: sections come out in template order, missing ones are skipped
+builder = pdf_utils.compile_template(["Experience", "Projects", "Summary"])
+data = builder(TITLE, SECTIONS, SKILLS)
+assert is_pdf(data), "compile_template builder did not return a PDF"
+text = pdf_text(data)
+assert text.index("Experience") < text.index("Summary"), "compile_template ignored the section order"
+assert "Projects" not in text, "compile_template rendered a missing section"
+
+# exporter streaming: into a caller's sink, and into a rewound spool file
+sink = io.BytesIO()
+pdf_exporter.stream_resume_pdf(RESUME_TEXT, sink)
+assert is_pdf(sink.getvalue()), "stream_resume_pdf did not write a PDF"
+assert "Jane Doe" in pdf_text(sink.getvalue()), "streamed PDF lost the resume text"
+
+with pdf_exporter.spool_resume_pdf(RESUME_TEXT) as spool:
+    data = spool.read()
+assert is_pdf(data), "spool_resume_pdf is not rewound onto a PDF"
+assert "Jane Doe" in pdf_text(data), "spooled PDF lost the resume text"
+
+# batch export keeps input order
+batch = pdf_exporter.generate_resume_pdfs_batch([RESUME_TEXT, RESUME_TEXT.replace("Jane Doe", "John Roe")])
+assert len(batch) == 2 and all(is_pdf(b) for b in batch), "generate_resume_pdfs_batch did not return one PDF per input"
+assert "John Roe" in pdf_text(batch[1]), "generate_resume_pdfs_batch reordered its results"
+
+# layout renderer: every leading bullet marker is replaced by a single "•"
+text = pdf_text(render_resume("Jane Doe\nEXPERIENCE\n- Led audits\n• - Built reports\nPlain line"))
+lines = text.splitlines()
+assert "• Led audits" in lines and "• Built reports" in lines, lines
+assert "Plain line" in lines and not any(line.startswith(("-", "• -", "• •")) for line in lines), lines
+
+# section flowables: consecutive bullet lines and plain lines each merge into one <br/> paragraph;
+# a blank line ends the run
+flowables = pdf_utils._section_flowables("Experience", "- Built reports\n- Led audits\nPlain one\nPlain two\n\n• Third")
+texts = [f.text for f in flowables if hasattr(f, "text")]
+assert texts == ["Experience", "• Built reports<br/>• Led audits", "Plain one<br/>Plain two", "• Third"], texts
+prose = pdf_utils._section_flowables("Summary", "Analyst.\nFive years.")
+assert [f.text for f in prose if hasattr(f, "text")] == ["Summary", "Analyst.<br/>Five years."]
+
+sys.stdout.write("PDF tests passed\n")